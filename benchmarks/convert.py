@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lab_convert import WHITES, convert, in_srgb_gamut, lab_to_srgb, srgb_to_lab  # noqa: E402
+
+
+COLOUR_OBSERVERS = {2: "CIE 1931 2 Degree Standard Observer", 10: "CIE 1964 10 Degree Standard Observer"}
+COLORMATH_OBSERVERS = {2: "2", 10: "10"}
+
+
+def random_lab(rng, n):
+    return rng.uniform([0.0, -100.0, -100.0], [100.0, 100.0, 100.0], size=(n, 3))
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_colormath(lab, illuminant, observer):
+    try:
+        from colormath.color_conversions import convert_color
+        from colormath.color_objects import LabColor, sRGBColor
+    except ImportError:
+        return None, None
+
+    # colormath 3.0 still calls numpy.asscalar, which NumPy 1.23 removed
+    if not hasattr(np, "asscalar"):
+        np.asscalar = lambda value: value.item()
+
+    colors = [
+        LabColor(*row, observer=COLORMATH_OBSERVERS[observer], illuminant=illuminant.lower()) for row in lab.tolist()
+    ]
+
+    # One object per point, as an application looping over colormath colors would convert them
+    start = time.perf_counter()
+    values = [convert_color(color, sRGBColor).get_value_tuple() for color in colors]
+    return time.perf_counter() - start, np.array(values)
+
+
+def bench_colour(lab, illuminant, observer):
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import colour
+    except ImportError:
+        return None, None
+
+    white = colour.CCS_ILLUMINANTS[COLOUR_OBSERVERS[observer]][illuminant]
+
+    def srgb():
+        xyz = colour.Lab_to_XYZ(lab, white)
+        return colour.XYZ_to_sRGB(xyz, white, chromatic_adaptation_transform="Bradford")
+
+    return timed(srgb)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark L*a*b* to sRGB against colormath and colour-science.")
+    parser.add_argument("--points", type=int, default=1_000_000, help="Colors for the vectorized engines")
+    parser.add_argument("--colormath-sample", type=int, default=2000, help="Colors timed with colormath")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    lab = random_lab(rng, args.points)
+    sample = slice(0, args.colormath_sample)
+    results = {"points": args.points, "whites": {}}
+
+    for illuminant, observer in WHITES:
+        ours, values = timed(convert, lab, "srgb", illuminant, observer)
+        row = {"vectorized_s": ours}
+
+        # Compared in gamut only: the libraries extend the transfer curve below 0 differently
+        inside = in_srgb_gamut(values)
+        colour_time, colour_values = bench_colour(lab, illuminant, observer)
+        if colour_time is not None:
+            row["colour_s"] = colour_time
+            row["colour_max_abs_diff"] = float(np.max(np.abs(values[inside] - colour_values[inside])))
+
+        colormath_time, colormath_values = bench_colormath(lab[sample], illuminant, observer)
+        if colormath_time is not None:
+            # Extrapolated from the sample: per-color calls scale linearly
+            row["colormath_s_extrapolated"] = colormath_time * args.points / args.colormath_sample
+            diff = np.abs(values[sample] - colormath_values)[inside[sample]]
+            row["colormath_max_abs_diff"] = float(np.max(diff))
+            row["speedup_vs_colormath"] = row["colormath_s_extrapolated"] / ours
+
+        results["whites"][f"{illuminant}/{observer}"] = row
+        print(f"{illuminant}/{observer}°: " + ", ".join(f"{key}={value:.4g}" for key, value in row.items()))
+
+    hex_time, _ = timed(convert, lab, "hex")
+    xyz_time, _ = timed(convert, lab, "xyz")
+    round_trip_time, back = timed(srgb_to_lab, lab_to_srgb(lab))
+    results["hex_s"] = hex_time
+    results["xyz_s"] = xyz_time
+    results["round_trip"] = {"seconds": round_trip_time, "max_abs_diff": float(np.max(np.abs(back - lab)))}
+    print(f"hex {hex_time:.3f} s, xyz {xyz_time:.3f} s, sRGB->Lab {round_trip_time:.3f} s")
+    print(f"Lab->sRGB->Lab max abs diff {results['round_trip']['max_abs_diff']:.2e}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delta_e import delta_e, delta_e_matrix  # noqa: E402
+
+
+COLOUR_METHODS = {"76": "CIE 1976", "94": "CIE 1994", "2000": "CIE 2000"}
+
+
+def random_lab(rng, n):
+    return rng.uniform([0.0, -100.0, -100.0], [100.0, 100.0, 100.0], size=(n, 3))
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_colormath(lab1, lab2, method):
+    try:
+        from colormath import color_diff
+        from colormath.color_objects import LabColor
+    except ImportError:
+        return None, None
+
+    # colormath 3.0 still calls numpy.asscalar, which NumPy 1.23 removed
+    if not hasattr(np, "asscalar"):
+        np.asscalar = lambda value: value.item()
+
+    function = {"76": color_diff.delta_e_cie1976, "94": color_diff.delta_e_cie1994, "2000": color_diff.delta_e_cie2000}[
+        method
+    ]
+    colors1 = [LabColor(*row) for row in lab1.tolist()]
+    colors2 = [LabColor(*row) for row in lab2.tolist()]
+
+    # Per-pair calls, as an application looping over colormath objects would make them
+    start = time.perf_counter()
+    values = np.array([function(c1, c2) for c1, c2 in zip(colors1, colors2)])
+    return time.perf_counter() - start, values
+
+
+def bench_colour(lab1, lab2, method):
+    try:
+        import colour
+    except ImportError:
+        return None, None
+    return timed(colour.delta_E, lab1, lab2, method=COLOUR_METHODS[method])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark delta E against colormath and colour-science.")
+    parser.add_argument("--points", type=int, default=1_000_000, help="Pairs for the vectorized engines")
+    parser.add_argument("--colormath-sample", type=int, default=2000, help="Pairs timed with colormath")
+    parser.add_argument("--matrix", type=int, nargs=2, default=(2000, 20000), help="Many-to-many shape")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    lab1 = random_lab(rng, args.points)
+    lab2 = random_lab(rng, args.points)
+    sample = slice(0, args.colormath_sample)
+    results = {"points": args.points, "methods": {}}
+
+    for method in ("76", "94", "2000"):
+        ours, values = timed(delta_e, lab1, lab2, method)
+        row = {"vectorized_s": ours}
+
+        colour_time, colour_values = bench_colour(lab1, lab2, method)
+        if colour_time is not None:
+            row["colour_s"] = colour_time
+            row["colour_max_abs_diff"] = float(np.max(np.abs(values - colour_values)))
+
+        colormath_time, colormath_values = bench_colormath(lab1[sample], lab2[sample], method)
+        if colormath_time is not None:
+            # Extrapolated from the sample: per-pair calls scale linearly
+            row["colormath_s_extrapolated"] = colormath_time * args.points / args.colormath_sample
+            row["colormath_max_abs_diff"] = float(np.max(np.abs(values[sample] - colormath_values)))
+            row["speedup_vs_colormath"] = row["colormath_s_extrapolated"] / ours
+
+        results["methods"][method] = row
+        print(f"dE{method}: " + ", ".join(f"{key}={value:.4g}" for key, value in row.items()))
+
+    rows, cols = args.matrix
+    matrix_time, _ = timed(delta_e_matrix, random_lab(rng, rows), random_lab(rng, cols))
+    results["matrix"] = {"shape": [rows, cols], "seconds": matrix_time, "pairs_per_s": rows * cols / matrix_time}
+    print(f"dE2000 matrix {rows}x{cols}: {matrix_time:.3f} s ({rows * cols / matrix_time:,.0f} pairs/s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
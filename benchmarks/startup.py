@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = ("LabColorChart.py", "LabColorChart v1_REV.py", "LabColorChart_tkinter.py")
+
+
+def measure(app, timeout):
+    # Runs the app once in benchmark mode and returns seconds from launch to each stage. Each run
+    # opens a fresh session, on the worker as it would at a user's start, so the first window
+    # is timed with that work deferred rather than skipped
+    with tempfile.TemporaryDirectory() as session:
+        env = dict(os.environ, LABCOLORCHART_STARTUP_BENCH="1", LABCOLORCHART_SESSION=session)
+        start = time.time()
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, app)],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+
+    stages = {}
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "STARTUP":
+            stages[parts[1]] = float(parts[2]) - start
+    if "chart" not in stages:
+        raise RuntimeError(f"{app} did not reach the first chart:\n{result.stderr.strip()}")
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-to-first-window and time-to-first-chart of the GUI apps.")
+    parser.add_argument("apps", nargs="*", default=APPS)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs. the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for app in args.apps:
+        runs = [measure(app, args.timeout) for _ in range(args.runs)]
+        results[app] = {
+            stage: statistics.median(run[stage] for run in runs) for stage in ("window", "chart")
+        }
+        session = ""
+        if all("session" in run for run in runs):
+            session = f", session open {statistics.median(run['session'] for run in runs):.3f} s"
+        print(
+            f"{app}: first window {results[app]['window']:.3f} s, first chart {results[app]['chart']:.3f} s"
+            + session
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = [
+            f"{app} {stage}: {results[app][stage]:.3f} s vs {baseline[app][stage]:.3f} s"
+            for app in results
+            if app in baseline
+            for stage in ("window", "chart")
+            if results[app][stage] > baseline[app][stage] * (1.0 + args.tolerance)
+        ]
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
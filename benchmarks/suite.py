@@ -0,0 +1,271 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lab_chart import LabChart  # noqa: E402
+from lab_gamut import render_lab_slice  # noqa: E402
+from lab_grid import LabGrid  # noqa: E402
+from lab_import import import_lab_file  # noqa: E402
+from lab_quality import PRESETS  # noqa: E402
+from point_store import PointStore  # noqa: E402
+
+
+SLICE_SIZES = (128, 256, 512)
+CHART_POINTS = (1, 100, 10_000, 1_000_000)
+INGEST_POINTS = 1_000_000
+
+
+def random_lab(rng, n):
+    L = rng.uniform(0.0, 100.0, n)
+    a = rng.normal(10.0, 25.0, n)
+    b = rng.normal(-5.0, 25.0, n)
+    return L, a, b
+
+
+def peak_rss_mb():
+    # High-water mark of the whole process; not available on Windows
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def new_chart(background, points=None, labels=True):
+    # Chart on its own Agg canvas, as a headless renderer builds it
+    fig = Figure(figsize=(6.4, 4.8), dpi=100)
+    FigureCanvasAgg(fig)
+    chart = LabChart(background, fig=fig, auto_redraw=False, labels=labels)
+    if points is not None:
+        chart.set_points(*points)
+    return chart
+
+
+def measure(run, setup, repeat):
+    # Median wall time over `repeat` runs, then one more run under tracemalloc for the peak of
+    # Python and NumPy allocations (tracing slows the run, so it is not timed)
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+        del state
+
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+
+    return {
+        "seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "peak_mb": peak / 2**20,
+        "maxrss_mb": peak_rss_mb(),
+    }
+
+
+def lazy(build):
+    # Builds a fixture on its first use, in the setup of the first case that needs it, and keeps
+    # it for the later runs and cases; fixtures of cases left out by --only are never built
+    built = []
+
+    def get():
+        if not built:
+            built.append(build())
+        return built[0]
+
+    return get
+
+
+def build_cases(args, tmp):
+    # (name, setup, run): setup is untimed and returns the state run() works on. Each fixture
+    # draws from its own generator, so its points do not depend on which cases run
+    def lab_points(key, n):
+        return lazy(lambda: random_lab(np.random.default_rng([args.seed, zlib.crc32(key.encode())]), n))
+
+    cases = []
+
+    for size in args.slice_sizes:
+        cases.append((f"gamut.slice.{size}", lambda: None, lambda _, size=size: render_lab_slice(50.0, size)))
+
+    background = lazy(lambda: render_lab_slice(50.0))
+    for n in args.points:
+        points = lab_points(f"chart.{n}", n)
+
+        # Building the points' artists and the first full draw, from an empty chart
+        def chart_setup(points=points):
+            return new_chart(background()), points()
+
+        def chart_run(state):
+            chart, points = state
+            chart.set_points(*points)
+            chart.fig.canvas.draw()
+
+        # Encoding the finished chart
+        def png_setup(points=points):
+            chart = new_chart(background(), points())
+            chart.fig.canvas.draw()
+            return chart
+
+        def png_run(chart):
+            chart.fig.savefig(io.BytesIO(), format="png", dpi=100)
+
+        cases.append((f"chart.{n}", chart_setup, chart_run))
+        cases.append((f"png.{n}", png_setup, png_run))
+
+    # A 100-point chart exported at each quality preset; the backgrounds are built beforehand
+    export_points = lab_points("export", 100)
+    for quality in PRESETS.values():
+
+        def export_setup(quality=quality):
+            points = export_points()
+            backgrounds = quality.backgrounds()
+            backgrounds.nearest(points[0][-1])
+            return new_chart(background(), points, quality.labels), backgrounds, points
+
+        def export_run(state, quality=quality):
+            chart, backgrounds, points = state
+            chart.set_background(backgrounds.nearest(points[0][-1]))
+            chart.fig.savefig(io.BytesIO(), format="png", dpi=quality.dpi)
+
+        cases.append((f"export.{quality.name}", export_setup, export_run))
+
+    # Small multiples of 100 lots in one figure, laid out and saved in one pass
+    lots = lazy(lambda: [(f"lot{i}",) + lab_points(f"lot{i}", 500)() for i in range(100)])
+
+    def grid_run(lots):
+        grid = LabGrid(render_lab_slice(50.0, 192))
+        grid.set_panels(lots)
+        grid.savefig(io.BytesIO(), format="png", dpi=100)
+        grid.close()
+
+    cases.append(("grid.100", lots, grid_run))
+
+    ingest_points = lab_points("ingest", args.ingest_points)
+
+    def write_csv():
+        path = os.path.join(tmp, "points.csv")
+        np.savetxt(path, np.column_stack(ingest_points()), fmt="%.3f", delimiter=",", header="L,a,b", comments="")
+        return path
+
+    cases.append(("ingest.csv", lazy(write_csv), import_lab_file))
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed, skipping ingest.parquet", file=sys.stderr)
+    else:
+
+        def write_parquet():
+            path = os.path.join(tmp, "points.parquet")
+            L, a, b = ingest_points()
+            pq.write_table(pa.table({"L": L, "a": a, "b": b}), path)
+            return path
+
+        cases.append(("ingest.parquet", lazy(write_parquet), import_lab_file))
+
+    # Readings arriving in small batches, as the GUI and streams append them
+    def store_run(points):
+        L, a, b = points
+        store = PointStore(metadata=True)
+        for start in range(0, len(L), 100):
+            store.extend(L[start : start + 100], a[start : start + 100], b[start : start + 100], batch="bench")
+
+    cases.append(("ingest.store", ingest_points, store_run))
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks of chart rendering, backgrounds and ingestion.")
+    parser.add_argument("--points", type=int, nargs="+", default=CHART_POINTS, help="Chart sizes to render")
+    parser.add_argument("--slice-sizes", type=int, nargs="+", default=SLICE_SIZES)
+    parser.add_argument("--ingest-points", type=int, default=INGEST_POINTS)
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--only", nargs="+", metavar="PREFIX", help="Run only the cases starting with these")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs. the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, setup, run in build_cases(args, tmp):
+            if args.only and not name.startswith(tuple(args.only)):
+                continue
+            results[name] = measure(run, setup, args.runs)
+            print(f"{name:<22} {results[name]['seconds'] * 1000:10.1f} ms  peak {results[name]['peak_mb']:8.1f} MB")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": platform.platform(),
+            "runs": args.runs,
+            "maxrss_mb": peak_rss_mb(),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = [
+            f"{name}: {results[name]['seconds'] * 1000:.1f} ms vs {baseline[name]['seconds'] * 1000:.1f} ms"
+            for name in results
+            if name in baseline
+            if results[name]["seconds"] > baseline[name]["seconds"] * (1.0 + args.tolerance)
+        ]
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
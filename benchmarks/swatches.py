@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delta_e import METHODS, delta_e  # noqa: E402
+from swatch_index import SwatchIndex  # noqa: E402
+
+
+def uniform_library(rng, n):
+    return rng.uniform([0.0, -100.0, -100.0], [100.0, 100.0, 100.0], size=(n, 3))
+
+
+def clustered_library(rng, n, clusters=20):
+    # Tight families of swatches with empty space between them, as in a real fan deck
+    centers = uniform_library(rng, clusters)
+    return centers[rng.integers(0, clusters, n)] + rng.normal(0.0, 2.0, size=(n, 3))
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def brute_force(library, queries, k, method):
+    # Every swatch against every query, in blocks of queries
+    indices = np.empty((len(queries), k), dtype=np.intp)
+    distances = np.empty((len(queries), k))
+    for start in range(0, len(queries), 64):
+        block = delta_e(library[None, :, :], queries[start : start + 64, None, :], method)
+        order = np.argsort(block, axis=1)[:, :k]
+        indices[start : start + len(block)] = order
+        distances[start : start + len(block)] = np.take_along_axis(block, order, axis=1)
+    return indices, distances
+
+
+def check(name, library, queries, k, method):
+    index = SwatchIndex(library)
+    index_time, (_, distances) = timed(index.query, queries, k=k, method=method)
+    brute_time, (_, expected) = timed(brute_force, library, queries, k, method)
+
+    # Compared by distance, so ties between equally close swatches do not count as misses
+    wrong = np.any(distances > expected + 1e-9, axis=1)
+    row = {
+        "index_s": index_time,
+        "brute_force_s": brute_time,
+        "wrong": int(wrong.sum()),
+        "max_extra_delta_e": float(np.max(distances - expected)),
+    }
+    print(f"{name} dE{method}: " + ", ".join(f"{key}={value:.4g}" for key, value in row.items()))
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check SwatchIndex queries against a brute-force scan.")
+    parser.add_argument("--swatches", type=int, default=50_000, help="Swatches in the uniform library")
+    parser.add_argument("--clustered", type=int, default=5000, help="Swatches in the clustered library")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    queries = uniform_library(rng, args.queries)
+    libraries = {
+        "uniform": uniform_library(rng, args.swatches),
+        "clustered": clustered_library(rng, args.clustered),
+    }
+
+    results = {}
+    for name, library in libraries.items():
+        for method in METHODS:
+            results[f"{name}/{method}"] = check(name, library, queries, args.k, method)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    # Any miss is a bug: the index is exact
+    return 1 if any(row["wrong"] for row in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import numpy as np
+
+
+METHODS = ("76", "94", "2000")
+
+# Rows of the first operand per block in many-to-many comparisons
+BLOCK_SIZE = 4096
+
+
+def _split(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    return lab[..., 0], lab[..., 1], lab[..., 2]
+
+
+def delta_e76(lab1, lab2):
+    # Euclidean distance; lab1 and lab2 broadcast against each other over (..., 3)
+    L1, a1, b1 = _split(lab1)
+    L2, a2, b2 = _split(lab2)
+    return np.sqrt((L1 - L2) ** 2 + (a1 - a2) ** 2 + (b1 - b2) ** 2)
+
+
+def delta_e94(lab1, lab2, textiles=False):
+    # CIE 1994; lab1 is the reference color, so the formula is not symmetric
+    kL, K1, K2 = (2.0, 0.048, 0.014) if textiles else (1.0, 0.045, 0.015)
+
+    L1, a1, b1 = _split(lab1)
+    L2, a2, b2 = _split(lab2)
+
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    dL = L1 - L2
+    dC = C1 - C2
+    dH2 = np.maximum((a1 - a2) ** 2 + (b1 - b2) ** 2 - dC**2, 0.0)
+
+    SC = 1.0 + K1 * C1
+    SH = 1.0 + K2 * C1
+    return np.sqrt((dL / kL) ** 2 + (dC / SC) ** 2 + dH2 / SH**2)
+
+
+def delta_e2000(lab1, lab2, kL=1.0, kC=1.0, kH=1.0):
+    # CIEDE2000 (Sharma, Wu and Dalal 2005), vectorized over any broadcastable shapes
+    L1, a1, b1 = _split(lab1)
+    L2, a2, b2 = _split(lab2)
+
+    C_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2.0
+    C_mean7 = C_mean**7
+    G = 0.5 * (1.0 - np.sqrt(C_mean7 / (C_mean7 + 25.0**7)))
+
+    a1p = (1.0 + G) * a1
+    a2p = (1.0 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.mod(np.degrees(np.arctan2(b1, a1p)), 360.0)
+    h2p = np.mod(np.degrees(np.arctan2(b2, a2p)), 360.0)
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+
+    # Hue difference is undefined (zero) when either chroma is zero
+    chroma_product = C1p * C2p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180.0, dhp - 360.0, np.where(dhp < -180.0, dhp + 360.0, dhp))
+    dhp = np.where(chroma_product == 0.0, 0.0, dhp)
+    dHp = 2.0 * np.sqrt(chroma_product) * np.sin(np.radians(dhp / 2.0))
+
+    Lp_mean = (L1 + L2) / 2.0
+    Cp_mean = (C1p + C2p) / 2.0
+
+    h_sum = h1p + h2p
+    hp_mean = np.where(
+        np.abs(h1p - h2p) <= 180.0, h_sum / 2.0, np.where(h_sum < 360.0, (h_sum + 360.0) / 2.0, (h_sum - 360.0) / 2.0)
+    )
+    hp_mean = np.where(chroma_product == 0.0, h_sum, hp_mean)
+
+    T = (
+        1.0
+        - 0.17 * np.cos(np.radians(hp_mean - 30.0))
+        + 0.24 * np.cos(np.radians(2.0 * hp_mean))
+        + 0.32 * np.cos(np.radians(3.0 * hp_mean + 6.0))
+        - 0.20 * np.cos(np.radians(4.0 * hp_mean - 63.0))
+    )
+    d_theta = 30.0 * np.exp(-(((hp_mean - 275.0) / 25.0) ** 2))
+    Cp_mean7 = Cp_mean**7
+    RC = 2.0 * np.sqrt(Cp_mean7 / (Cp_mean7 + 25.0**7))
+    Lp_offset = (Lp_mean - 50.0) ** 2
+    SL = 1.0 + 0.015 * Lp_offset / np.sqrt(20.0 + Lp_offset)
+    SC = 1.0 + 0.045 * Cp_mean
+    SH = 1.0 + 0.015 * Cp_mean * T
+    RT = -np.sin(np.radians(2.0 * d_theta)) * RC
+
+    tL = dLp / (kL * SL)
+    tC = dCp / (kC * SC)
+    tH = dHp / (kH * SH)
+    return np.sqrt(tL**2 + tC**2 + tH**2 + RT * tC * tH)
+
+
+_FUNCTIONS = {"76": delta_e76, "94": delta_e94, "2000": delta_e2000}
+
+
+def delta_e(lab1, lab2, method="2000"):
+    # One-to-one, one-to-many or many-to-one, following NumPy broadcasting
+    try:
+        function = _FUNCTIONS[str(method)]
+    except KeyError:
+        raise ValueError(f"Unknown delta E method {method!r}, expected one of {METHODS}") from None
+    return function(lab1, lab2)
+
+
+def iter_delta_e_blocks(lab1, lab2, method="2000", block_size=BLOCK_SIZE):
+    # Many-to-many in row blocks: yields (start, block) with block[i, j] = dE(lab1[start + i], lab2[j]),
+    # so peak memory is block_size * len(lab2) values instead of len(lab1) * len(lab2)
+    lab1 = np.asarray(lab1, dtype=np.float64).reshape(-1, 3)
+    lab2 = np.asarray(lab2, dtype=np.float64).reshape(-1, 3)
+    for start in range(0, len(lab1), block_size):
+        yield start, delta_e(lab1[start : start + block_size, None, :], lab2[None, :, :], method)
+
+
+def delta_e_matrix(lab1, lab2, method="2000", block_size=BLOCK_SIZE, dtype=np.float32):
+    lab1 = np.asarray(lab1).reshape(-1, 3)
+    lab2 = np.asarray(lab2).reshape(-1, 3)
+    out = np.empty((len(lab1), len(lab2)), dtype=dtype)
+    for start, block in iter_delta_e_blocks(lab1, lab2, method, block_size):
+        out[start : start + len(block)] = block
+    return out
+
+
+def delta_e_to_target(L_values, a_values, b_values, target, method="2000"):
+    # Distance of every point from a single (L*, a*, b*) target, target first as the reference
+    lab = np.stack([np.asarray(L_values), np.asarray(a_values), np.asarray(b_values)], axis=-1)
+    return delta_e(np.asarray(target, dtype=np.float64), lab, method)
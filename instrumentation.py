@@ -0,0 +1,222 @@
+import logging
+import os
+import sys
+import threading
+import time
+import warnings
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+
+# LABCOLORCHART_PROFILE turns the instrumentation on: "1" or "time" records the wall time of every
+# stage, "alloc" adds the memory allocated per stage (tracemalloc), "cprofile" runs each render
+# under cProfile and "overlay" prints the last renders on the chart; modes combine with commas,
+# e.g. "alloc,overlay"
+PROFILE_MODES = ("time", "alloc", "cprofile", "overlay")
+
+# Renders kept for last_renders() and the debug overlay
+HISTORY = int(os.environ.get("LABCOLORCHART_PROFILE_HISTORY", 50))
+
+# cProfile output of each render is written here as NAME-NUMBER.prof when set
+PROFILE_DIR = os.environ.get("LABCOLORCHART_PROFILE_DIR")
+
+logger = logging.getLogger("labcolorchart")
+
+enabled = False
+modes = frozenset()
+
+_renders = deque(maxlen=HISTORY)
+_local = threading.local()
+_count = 0
+_count_lock = threading.Lock()
+_started_tracing = False
+
+# Returned by render() and stage() while disabled; a single shared no-op context
+_NULL = nullcontext()
+
+
+class Stage:
+    def __init__(self, name, seconds, allocated=None):
+        self.name = name
+        self.seconds = seconds
+        self.allocated = allocated
+
+
+class Render:
+    # One pass through an instrumented entry point and the stages timed inside it
+
+    def __init__(self, name, number):
+        self.name = name
+        self.number = number
+        self.thread = threading.current_thread().name
+        self.started = time.time()
+        self.seconds = None
+        self.allocated = None
+        self.peak = None
+        self.stages = []
+        self.profile = None
+
+    def summary(self):
+        parts = [f"{self.name} #{self.number} {self.seconds * 1000:.1f} ms"]
+        for stage in self.stages:
+            part = f"{stage.name} {stage.seconds * 1000:.1f} ms"
+            if stage.allocated is not None:
+                part += f" {stage.allocated / 2**20:+.1f} MB"
+            parts.append(part)
+        if self.peak is not None:
+            parts.append(f"peak {self.peak / 2**20:.1f} MB")
+        return ", ".join(parts)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "number": self.number,
+            "thread": self.thread,
+            "started": self.started,
+            "seconds": self.seconds,
+            "allocated": self.allocated,
+            "peak": self.peak,
+            "stages": [{"name": s.name, "seconds": s.seconds, "allocated": s.allocated} for s in self.stages],
+        }
+
+
+def enable(mode="time"):
+    # Also called at import time from LABCOLORCHART_PROFILE; benchmarks may call it directly
+    global enabled, modes, _started_tracing
+    requested = {"time" if part in ("1", "on", "true") else part for part in mode.lower().split(",") if part}
+    unknown = requested.difference(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode {', '.join(sorted(unknown))}, expected {PROFILE_MODES}")
+
+    modes = frozenset(requested | {"time"})
+    if "alloc" in modes:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    enabled = True
+
+
+def disable():
+    global enabled, _started_tracing
+    enabled = False
+    if _started_tracing:
+        import tracemalloc
+
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+def _traced():
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+
+def _next_number():
+    global _count
+    with _count_lock:
+        _count += 1
+        return _count
+
+
+@contextmanager
+def _render(name):
+    record = Render(name, _next_number())
+    _local.render = record
+
+    tracing = "alloc" in modes
+    if tracing:
+        import tracemalloc
+
+        tracemalloc.reset_peak()
+        before = _traced()
+
+    profiler = None
+    if "cprofile" in modes:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            record.profile = profiler
+            if PROFILE_DIR:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}-{record.number}.prof"))
+        if tracing and before is not None:
+            import tracemalloc
+
+            record.allocated = _traced() - before
+            record.peak = tracemalloc.get_traced_memory()[1] - before
+        _local.render = None
+        _renders.append(record)
+        logger.info(record.summary())
+
+
+@contextmanager
+def _stage(record, name):
+    before = _traced() if "alloc" in modes else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        record.stages.append(Stage(name, seconds, None if before is None else _traced() - before))
+
+
+def render(name):
+    # Context for one pass through an entry point; stages inside it on the same thread are
+    # recorded with it. Inside another render it is just a stage of that one, so set_points
+    # called from create_lab_color_chart shows up as part of it. While disabled this is a shared no-op
+    if not enabled:
+        return _NULL
+    record = getattr(_local, "render", None)
+    if record is not None:
+        return _stage(record, name)
+    return _render(name)
+
+
+def stage(name):
+    # Context timing one stage of the current render, or a no-op outside a render or while disabled
+    if not enabled:
+        return _NULL
+    record = getattr(_local, "render", None)
+    if record is None:
+        return _NULL
+    return _stage(record, name)
+
+
+def last_renders(count=None, name=None):
+    # The most recent renders, oldest first, optionally only those of one entry point
+    renders = [record for record in list(_renders) if name is None or record.name == name]
+    return renders if count is None else renders[-count:]
+
+
+def clear_renders():
+    _renders.clear()
+
+
+def overlay_text(count=3):
+    # Text for the on-chart debug overlay: the last few renders, one line each
+    return "\n".join(record.summary() for record in last_renders(count))
+
+
+if os.environ.get("LABCOLORCHART_PROFILE", "").lower() not in ("", "0", "off", "false"):
+    # A mistyped mode must not keep the apps from starting: it is reported once and profiling stays off
+    try:
+        enable(os.environ["LABCOLORCHART_PROFILE"])
+    except ValueError as e:
+        warnings.warn(f"LABCOLORCHART_PROFILE ignored: {str(e)}", RuntimeWarning)
@@ -0,0 +1,347 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from delta_e import METHODS
+import instrumentation
+from lab_import import import_lab_file, import_lab_groups
+from lab_export import DATA_FORMATS
+from lab_indicator import MODES
+from lab_overlays import GAMUTS
+from lab_quality import PRESETS, get_quality
+
+
+FORMATS = ("png", "svg", "pdf")
+
+
+def safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "chart"
+
+
+def iter_jobs(paths, group_by=None, **options):
+    # Yields (name, L, a, b) for every chart: one per file, or one per group when group_by is set
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if group_by is None:
+            L, a, b, _ = import_lab_file(path, **options)
+            yield stem, L, a, b
+        else:
+            groups, _ = import_lab_groups(path, group_by, **options)
+            for name, (L, a, b) in groups.items():
+                yield f"{stem}_{name}", L, a, b
+
+
+class BatchRenderer:
+    # Renders many charts in one process, reusing a single figure and the cached backgrounds
+
+    def __init__(
+        self,
+        out_dir,
+        formats=("png",),
+        dpi=None,
+        slices=None,
+        target=None,
+        method="2000",
+        swatches=None,
+        quality="screen",
+        tolerance=None,
+        gamut=None,
+        L_indicator="markers",
+        exporter=None,
+        data=None,
+    ):
+        from lab_chart import LabChart
+
+        # The quality sets the background resolution and, unless dpi is given, the output DPI
+        self.quality = get_quality(quality)
+        self.out_dir = out_dir
+        self.formats = formats
+        self.dpi = dpi if dpi is not None else self.quality.dpi
+        # With a ChartExporter files are encoded on its threads while the next chart is drawn
+        self.exporter = exporter
+        # "csv" or "parquet": also write every chart's points with their metrics
+        self.data = data
+        self.slices = slices if slices is not None else self.quality.backgrounds()
+        self.chart = LabChart(
+            self.slices.nearest(50), auto_redraw=False, labels=self.quality.labels, L_indicator=L_indicator
+        )
+        if target is not None:
+            self.chart.set_target(target, method)
+            if tolerance is not None:
+                self.chart.set_tolerance(tolerance)
+        if gamut is not None:
+            self.chart.show_gamut(gamut)
+        if swatches is not None:
+            from swatch_index import SwatchIndex
+
+            self.chart.delta_e_method = method
+            self.chart.set_swatches(SwatchIndex.load(swatches))
+        self.timings = []
+
+    def draw(self, name, L_values, a_values, b_values):
+        # Puts one lot on the chart, ready to be saved
+        # The median L* is more representative of a whole lot than its last reading
+        if len(L_values):
+            L = np.median(L_values)
+            self.chart.set_background(self.slices.nearest(L))
+            self.chart.set_slice_L(L)
+        self.chart.set_points(L_values, a_values, b_values)
+
+        title = f"CIELab - {name}"
+        if self.chart.target is not None and len(L_values):
+            distances = self.chart.delta_e()
+            title += f" (ΔE{self.chart.delta_e_method} mean {distances.mean():.2f}, max {distances.max():.2f})"
+            if self.chart.overlays.tolerance is not None:
+                passed = self.chart.classify()["passed"]
+                title += f" pass {int(passed.sum())}/{len(passed)}"
+        self.chart.ax.set_title(title)
+
+    def render(self, name, L_values, a_values, b_values):
+        from lab_export import chart_metrics, write_points
+
+        start = time.perf_counter()
+
+        with instrumentation.render("batch_chart"):
+            self.draw(name, L_values, a_values, b_values)
+
+            paths = []
+            for fmt in self.formats:
+                path = os.path.join(self.out_dir, f"{safe_name(name)}.{fmt}")
+                with instrumentation.stage(f"savefig.{fmt}"):
+                    if self.exporter is not None:
+                        self.exporter.save_figure(self.chart.fig, path, fmt, self.dpi)
+                    else:
+                        self.chart.fig.savefig(path, format=fmt, dpi=self.dpi)
+                paths.append(path)
+
+            if self.data is not None:
+                path = os.path.join(self.out_dir, f"{safe_name(name)}.{self.data}")
+                metrics = chart_metrics(self.chart)
+                if self.exporter is not None:
+                    self.exporter.save_points(path, L_values, a_values, b_values, self.data, **metrics)
+                else:
+                    with instrumentation.stage(f"points.{self.data}"):
+                        write_points(path, L_values, a_values, b_values, self.data, **metrics)
+                paths.append(path)
+
+        self.timings.append(time.perf_counter() - start)
+        return paths
+
+    def summary(self):
+        if not self.timings:
+            return "No charts rendered"
+        total = sum(self.timings)
+        return (
+            f"Rendered {len(self.timings)} charts in {total:.2f} s "
+            f"({len(self.timings) / total:.1f} charts/s, "
+            f"mean {1000 * total / len(self.timings):.1f} ms, max {1000 * max(self.timings):.1f} ms)"
+        )
+
+
+def render_grid(jobs, out_dir, name="grid", formats=("png",), dpi=None, quality="screen", target=None, method="2000"):
+    # Every job as a panel of one small-multiples figure, on the background at the median L* of all points
+    from lab_gamut import lab_slice
+    from lab_grid import PANEL_SIZE, LabGrid
+    from lab_quality import GRID_STEP, MIN_GRID
+
+    start = time.perf_counter()
+    quality = get_quality(quality)
+    dpi = dpi if dpi is not None else quality.dpi
+    jobs = list(jobs)
+    L_all = np.concatenate([L for _, L, _, _ in jobs]) if jobs else np.empty(0)
+
+    # The background is tiled once per panel, so it is rendered at the panel's pixel size
+    size = min(max(int(np.ceil(PANEL_SIZE * dpi / GRID_STEP)) * GRID_STEP, MIN_GRID), quality.size)
+    background = lab_slice(np.median(L_all) if len(L_all) else 50, size, quality.step)
+
+    grid = LabGrid(background)
+    with instrumentation.render("grid"):
+        grid.set_panels(jobs, target, method)
+        paths = []
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{safe_name(name)}.{fmt}")
+            with instrumentation.stage(f"savefig.{fmt}"):
+                grid.savefig(path, format=fmt, dpi=dpi)
+            paths.append(path)
+    grid.close()
+
+    print(f"Rendered {len(jobs)} panels in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return paths
+
+
+def render_report(jobs, path, renderer):
+    # Every job as a page of one PDF, drawn on the renderer's chart and written page by page
+    from lab_export import PdfReport
+
+    start = time.perf_counter()
+    with PdfReport(path, title="CIELab report") as report:
+        for name, L, a, b in jobs:
+            with instrumentation.render("report_page"):
+                renderer.draw(name, L, a, b)
+                report.add(renderer.chart.fig)
+
+    print(f"Rendered {report.pages} pages in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return path
+
+
+def parse_target(text):
+    try:
+        L, a, b = (float(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected L,a,b but got {text!r}") from None
+    return L, a, b
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Render LAB color charts to files without a GUI.")
+    parser.add_argument("inputs", nargs="+", help="CSV/TXT/TSV or Parquet files of L*a*b* points")
+    parser.add_argument("-o", "--output-dir", default="charts", help="Directory for the rendered charts")
+    parser.add_argument(
+        "-f", "--format", dest="formats", action="append", choices=FORMATS, help="Output format (repeatable)"
+    )
+    parser.add_argument("--group-by", help="Render one chart per value of this column, e.g. a lot number")
+    parser.add_argument(
+        "--grid",
+        nargs="?",
+        const="grid",
+        metavar="NAME",
+        help="Render every chart as a panel of one small-multiples figure, saved as NAME (default grid)",
+    )
+    parser.add_argument(
+        "--quality",
+        type=get_quality,
+        default="screen",
+        help=f"{', '.join(PRESETS)} (default screen), or the target size in pixels as WIDTHxHEIGHT",
+    )
+    parser.add_argument("--dpi", type=float, help="Override the DPI of the quality")
+    parser.add_argument("--report", metavar="NAME", help="Render every chart as a page of one PDF, saved as NAME.pdf")
+    parser.add_argument("--data", choices=DATA_FORMATS, help="Also write each chart's points with their metrics")
+    parser.add_argument(
+        "--encoders", type=int, default=0, help="Threads compressing and writing files while charts are drawn"
+    )
+    parser.add_argument("--skip-rows", type=int, help="Metadata lines before the CSV header (found by default)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Render in this many processes")
+    parser.add_argument("--target", type=parse_target, help="Reference color as L,a,b; labels show delta E")
+    parser.add_argument("--method", choices=METHODS, default="2000", help="Delta E formula (default 2000)")
+    parser.add_argument(
+        "--tolerance", type=float, help="Outline this delta E tolerance around --target; titles count passes"
+    )
+    parser.add_argument("--gamut", choices=GAMUTS, help="Outline this gamut at the chart's L*")
+    parser.add_argument(
+        "--l-indicator", choices=MODES, default="markers", help="How the colorbar shows the L* of the points"
+    )
+    parser.add_argument("--swatches", help="Swatch index (.npz from swatch_index.py build); labels show the nearest")
+    return parser
+
+
+def check_options(parser, args):
+    # Options the chosen mode would ignore are refused instead of dropped silently
+    if args.grid:
+        mode = "--grid"
+        ignored = {
+            "--report": args.report,
+            "--data": args.data,
+            "--encoders": args.encoders,
+            "--swatches": args.swatches,
+            "--tolerance": args.tolerance is not None,
+            "--gamut": args.gamut,
+            "--l-indicator": args.l_indicator != "markers",
+            "-j": args.workers != 1,
+        }
+    elif args.report:
+        # Pages are drawn and written to the PDF one at a time
+        mode = "--report"
+        ignored = {"-f": args.formats, "--data": args.data, "--encoders": args.encoders, "-j": args.workers != 1}
+    elif args.workers > 1:
+        # Each process writes its own files
+        mode = "-j"
+        ignored = {"--encoders": args.encoders}
+    else:
+        return
+    given = [name for name, value in ignored.items() if value]
+    if given:
+        parser.error(f"{', '.join(given)} cannot be used with {mode}")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_options(parser, args)
+    formats = tuple(args.formats or ("png",))
+
+    # No display server: the Agg backend must be selected before pyplot is imported
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = iter_jobs(args.inputs, args.group_by, skip_rows=args.skip_rows)
+
+    if args.grid:
+        paths = render_grid(jobs, args.output_dir, args.grid, formats, args.dpi, args.quality, args.target, args.method)
+        for path in paths:
+            print(path)
+        return 0
+
+    if args.workers > 1:
+        from lab_render_farm import render_farm
+
+        render_farm(
+            list(jobs),
+            args.output_dir,
+            formats,
+            args.dpi,
+            args.workers,
+            target=args.target,
+            method=args.method,
+            swatches=args.swatches,
+            quality=args.quality,
+            tolerance=args.tolerance,
+            gamut=args.gamut,
+            L_indicator=args.l_indicator,
+            data=args.data,
+        )
+        return 0
+
+    exporter = None
+    if args.encoders > 0:
+        from lab_export import ChartExporter
+
+        exporter = ChartExporter(args.encoders)
+
+    renderer = BatchRenderer(
+        args.output_dir,
+        formats,
+        args.dpi,
+        target=args.target,
+        method=args.method,
+        swatches=args.swatches,
+        quality=args.quality,
+        tolerance=args.tolerance,
+        gamut=args.gamut,
+        L_indicator=args.l_indicator,
+        exporter=exporter,
+        data=args.data,
+    )
+
+    if args.report:
+        print(render_report(jobs, os.path.join(args.output_dir, f"{safe_name(args.report)}.pdf"), renderer))
+        return 0
+
+    for name, L, a, b in jobs:
+        for path in renderer.render(name, L, a, b):
+            print(path)
+
+    if exporter is not None:
+        # The charts are drawn; wait for their files
+        exporter.close()
+    print(renderer.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
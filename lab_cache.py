@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+
+CACHE_DIR = os.environ.get("LABCOLORCHART_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "labcolorchart"))
+
+
+def cache_key(name, params):
+    # Same name and parameters, same file: the key is a hash of both, so every app instance and
+    # batch worker computing a given background finds the same entry
+    text = json.dumps([name, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def cache_path(name, params, suffix=".npy"):
+    return os.path.join(CACHE_DIR, f"{name}-{cache_key(name, params)}{suffix}")
+
+
+def _lock_file(f):
+    if sys.platform == "win32":
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+@contextmanager
+def _build_lock(path):
+    # Serializes the processes building the same entry, so it is computed once and the others
+    # wait for it; without a writable cache directory every process builds its own
+    try:
+        f = open(path + ".lock", "a+b")
+    except OSError:
+        yield
+        return
+    with f:
+        try:
+            _lock_file(f)
+        except OSError:
+            pass
+        yield
+
+
+def write_atomic(path, array):
+    # Written to a temporary file in the same directory and renamed over `path`: readers see
+    # either no file or a complete one, never a partial write
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file private to us; the entry is for every process to read
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _load(path):
+    # Memory-mapped read-only, so processes using the same entry share its pages
+    try:
+        array = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return array
+
+
+def cached_array(name, params, build):
+    # The array build() returns for these parameters, computed at most once across processes and
+    # then loaded from CACHE_DIR. Bump a version in `params` when the computation changes
+    path = cache_path(name, params)
+    array = _load(path)
+    if array is not None:
+        return array
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+    except OSError:
+        pass
+    with _build_lock(path):
+        # Another process may have built it while we waited for the lock
+        array = _load(path)
+        if array is not None:
+            return array
+
+        array = build()
+        try:
+            write_atomic(path, array)
+        except OSError:
+            # A read-only cache directory only costs us the on-disk cache
+            return array
+
+    # The mapped file rather than our copy, so this process shares the pages too
+    loaded = _load(path)
+    return array if loaded is None else loaded
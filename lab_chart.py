@@ -0,0 +1,593 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.axis import Axis
+from matplotlib.colors import LogNorm, to_rgba_array
+from matplotlib.image import AxesImage
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+import instrumentation
+from delta_e import delta_e_to_target
+from lab_convert import D65_WHITE, marker_colors, white_point
+from lab_indicator import LIndicator, L_level_counts
+from lab_labels import LabelLayer
+from lab_overlays import Overlays
+
+
+# a*/b* range of the chart axes
+AXIS_LIMIT = 100
+
+# Above this many points the chart draws a binned density image instead of markers
+DENSITY_THRESHOLD = 5000
+DENSITY_BINS = 200
+
+# In density mode only selected points and outliers beyond this many standard deviations are labelled
+OUTLIER_SIGMA = 3.0
+MAX_OUTLIER_LABELS = 50
+
+
+def density_cells(a_values, b_values, bins=DENSITY_BINS, limit=AXIS_LIMIT):
+    # Row (b*) and column (a*) of the density cell of each point inside the chart area
+    scale = bins / (2.0 * limit)
+    ix = np.floor((np.asarray(a_values) + limit) * scale).astype(np.intp)
+    iy = np.floor((np.asarray(b_values) + limit) * scale).astype(np.intp)
+    inside = (ix >= 0) & (ix < bins) & (iy >= 0) & (iy < bins)
+    return iy[inside], ix[inside]
+
+
+def bin_density(a_values, b_values, bins=DENSITY_BINS, limit=AXIS_LIMIT):
+    # Vectorized 2D histogram over the chart area; rows follow b*, columns a*
+    iy, ix = density_cells(a_values, b_values, bins, limit)
+    counts = np.bincount(iy * bins + ix, minlength=bins * bins)
+    return counts.reshape(bins, bins)
+
+
+def outlier_distances(a_values, b_values, mean, inv_cov):
+    # Squared Mahalanobis distance of each point in the a*b* plane
+    d = np.column_stack([a_values, b_values]) - mean
+    return np.einsum("ij,jk,ik->i", d, inv_cov, d)
+
+
+def fit_outliers(a_values, b_values):
+    # Centroid and covariance of the a*b* cloud, reused to classify later points, and the
+    # most extreme points beyond OUTLIER_SIGMA
+    ab = np.column_stack([a_values, b_values])
+    mean = ab.mean(axis=0)
+    inv_cov = np.linalg.pinv(np.atleast_2d(np.cov(ab, rowvar=False)))
+
+    d2 = outlier_distances(a_values, b_values, mean, inv_cov)
+    candidates = np.flatnonzero(d2 > OUTLIER_SIGMA**2)
+    order = np.argsort(d2[candidates])[::-1][:MAX_OUTLIER_LABELS]
+    return mean, inv_cov, np.sort(candidates[order])
+
+
+class PreparedPoints:
+    # Result of LabChart.prepare_points: every array set_points needs, computed without
+    # touching an artist so it can be built on a worker thread
+
+    def __init__(self, L_values, a_values, b_values):
+        self.L_values = L_values
+        self.a_values = a_values
+        self.b_values = b_values
+        self.density_counts = None
+        self.ab_mean = None
+        self.ab_inv_cov = None
+        self.outliers = np.empty(0, dtype=np.intp)
+        self.L_counts = None
+        self.labelled = np.empty(0, dtype=np.intp)
+        self.label_texts = []
+
+    @property
+    def count(self):
+        return len(self.L_values)
+
+
+class LabChart:
+    # Long-lived chart: the figure, background and colorbar are built once and
+    # new points are added to the existing artists instead of redrawing everything
+
+    def __init__(
+        self,
+        background,
+        fig=None,
+        density_threshold=DENSITY_THRESHOLD,
+        density_bins=DENSITY_BINS,
+        auto_redraw=True,
+        labels=True,
+        L_indicator="markers",
+    ):
+        self.fig = fig if fig is not None else plt.figure()
+        self.ax = self.fig.add_subplot()
+        self.closed = False
+
+        # Headless renderers turn this off and draw only when saving
+        self.auto_redraw = auto_redraw
+
+        # Thumbnails leave out the text labels, whose layout dominates small charts
+        self.show_labels = labels
+        self.density_threshold = density_threshold
+        self.density_bins = density_bins
+
+        self.L_values = np.empty(0)
+        self.a_values = np.empty(0)
+        self.b_values = np.empty(0)
+
+        # Indices of the points that get a marker and a label
+        self.labelled = np.empty(0, dtype=np.intp)
+        self.selected = np.empty(0, dtype=np.intp)
+        self._outliers = np.empty(0, dtype=np.intp)
+        self._ab_mean = None
+        self._ab_inv_cov = None
+        self.density_counts = None
+
+        # Optional reference color; labels then show each point's distance from it
+        self.target = None
+        self.delta_e_method = "2000"
+
+        # Optional swatch library; labels then show each point's nearest swatch
+        self.swatches = None
+
+        # Reference white of the measurements; markers are filled with the sRGB color of each point
+        self.white = D65_WHITE
+
+        # Display the image as the graph background; an embedded chart may start without one
+        # and get it from set_background once it has been looked up
+        self._background = background
+        if background is None:
+            background = np.zeros((1, 1, 4), dtype=np.uint8)
+        self.image = self.ax.imshow(background, extent=[-AXIS_LIMIT, AXIS_LIMIT, -AXIS_LIMIT, AXIS_LIMIT], alpha=1)
+
+        # Point density for large point sets, hidden until the threshold is crossed
+        self.density_image = self.ax.imshow(
+            np.ma.masked_all((density_bins, density_bins)),
+            extent=[-AXIS_LIMIT, AXIS_LIMIT, -AXIS_LIMIT, AXIS_LIMIT],
+            origin="lower",
+            cmap="magma",
+            norm=LogNorm(vmin=1, vmax=2),
+            interpolation="nearest",
+            alpha=0.85,
+            visible=False,
+        )
+
+        # Scatter plot for LAB color points, each filled with its own sRGB color
+        self.scatter = self.ax.scatter([], [], color="none", edgecolors="black", linewidths=1.5)
+        # Point labels, culled to the view and decluttered at draw time
+        self.label_layer = LabelLayer(self.ax)
+        self.target_marker = self.ax.scatter([], [], marker="X", color="red", edgecolors="white", s=90, zorder=3)
+
+        # Tolerance regions around the target and the sRGB gamut outline, hidden until set
+        self.overlays = Overlays(self.ax)
+
+        # Add labels and title
+        self.ax.set_xlabel("a*")
+        self.ax.set_ylabel("b*")
+        self.ax.set_title("CIELab")
+
+        # Add reference lines for the X and Y axes
+        self.ax.axhline(0, color="black", linewidth=0.7, linestyle="--")
+        self.ax.axvline(0, color="black", linewidth=0.5, linestyle="--")
+
+        # Grid settings
+        self.ax.grid(True, linestyle="--", alpha=0.6)
+
+        # Define axis limits
+        self.ax.set_xlim(-AXIS_LIMIT, AXIS_LIMIT)
+        self.ax.set_ylim(-AXIS_LIMIT, AXIS_LIMIT)
+
+        # Add a black and white gradient bar
+        cax = self.fig.add_axes([0.85, 0.1, 0.04, 0.79])
+        cmap = plt.cm.gray
+        norm = plt.Normalize(0, 100)
+        self.colorbar = self.fig.colorbar(plt.cm.ScalarMappable(cmap=cmap, norm=norm), cax=cax)
+        self.colorbar.set_label("L*")
+
+        # L* of the points on the color bar as markers, a histogram or a density curve
+        self.L_indicator = LIndicator(cax, L_indicator, backdrop=self.colorbar.solids)
+
+        # Artists holding only the points added since the last full draw; they are
+        # drawn on top of the cached canvas with blitting
+        self._pending_scatter = self.ax.scatter(
+            [], [], color="none", edgecolors="black", linewidths=1.5, animated=True
+        )
+
+        self._blit_background = None
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+        self.fig.canvas.mpl_connect("close_event", self._on_close)
+
+        # LABCOLORCHART_PROFILE: time every draw and optionally print the timings on the chart
+        self.debug_text = None
+        if instrumentation.enabled:
+            self._instrument_draw()
+
+    def _instrument_draw(self):
+        # Wraps this figure's draw, so full draws by the canvas and by savefig are recorded too;
+        # the overlay shows the renders finished before the draw it is part of
+        draw = self.fig.draw
+        if "overlay" in instrumentation.modes:
+            self.debug_text = self.fig.text(
+                0.01,
+                0.99,
+                "",
+                va="top",
+                family="monospace",
+                fontsize=6,
+                bbox=dict(facecolor="white", alpha=0.7, linewidth=0),
+                zorder=10,
+            )
+
+        def timed_draw(renderer):
+            if self.debug_text is not None:
+                self.debug_text.set_text(instrumentation.overlay_text())
+            with instrumentation.render("draw"):
+                draw(renderer)
+
+        self.fig.draw = timed_draw
+
+    def _label_texts(self, indices, points=None):
+        # Labels for the given points of `points` (the chart's own arrays by default)
+        if not self.show_labels:
+            return []
+        L_values, a_values, b_values = (self.L_values, self.a_values, self.b_values) if points is None else points
+        L_values = L_values[indices]
+        a_values = a_values[indices]
+        b_values = b_values[indices]
+        texts = [f"({a};{b})" for a, b in zip(a_values.tolist(), b_values.tolist())]
+        if self.target is not None:
+            distances = delta_e_to_target(L_values, a_values, b_values, self.target, self.delta_e_method)
+            texts = [f"{text} ΔE={d:.2f}" for text, d in zip(texts, distances.tolist())]
+        if self.swatches is not None and len(texts):
+            names, distances = self._query_swatches(L_values, a_values, b_values)
+            texts = [f"{text} → {name} ΔE={d:.2f}" for text, name, d in zip(texts, names.tolist(), distances.tolist())]
+        return texts
+
+    def _on_draw(self, event):
+        # Cache the fully drawn canvas so later points can be blitted onto it; vector
+        # backends swapped in by savefig have nothing to cache, and a PNG saved at another DPI
+        # is not what the window shows
+        if event.canvas.supports_blit and not event.canvas.is_saving():
+            self._blit_background = event.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _on_close(self, event):
+        self.closed = True
+        self._blit_background = None
+
+    @property
+    def count(self):
+        return len(self.L_values)
+
+    @property
+    def density(self):
+        return self.density_counts is not None
+
+    def set_background(self, background):
+        if background is self._background or background is None:
+            return
+        self._background = background
+        self.image.set_data(background)
+        self.redraw()
+
+    def set_L_indicator(self, mode):
+        # "markers", "histogram" or "density"
+        self.L_indicator.set_mode(mode)
+        self.redraw()
+
+    def _update_density_image(self):
+        counts = self.density_counts
+        self.density_image.set_data(np.ma.masked_equal(counts, 0))
+        self.density_image.set_clim(1, max(int(counts.max()), 2))
+
+    def _set_labels(self, indices, texts=None):
+        self.labelled = np.asarray(indices, dtype=np.intp)
+        self.scatter.set_offsets(np.column_stack([self.a_values[self.labelled], self.b_values[self.labelled]]))
+        self.scatter.set_facecolor(self._marker_colors(self.labelled))
+
+        if texts is None:
+            with instrumentation.stage("label_texts"):
+                texts = self._label_texts(self.labelled)
+
+        with instrumentation.stage("annotations"):
+            if not texts:
+                self.label_layer.set_labels([], [], [])
+                return
+            # Selected points win their spot over outliers and the rest
+            first = np.flatnonzero(np.isin(self.labelled, self.selected))
+            self.label_layer.set_labels(self.a_values[self.labelled], self.b_values[self.labelled], texts, first)
+
+    def prepare_points(self, L_values, a_values, b_values):
+        # The array work of set_points (binning, outliers, delta E and swatch lookups for the
+        # labels); it reads the chart's settings but changes nothing, so it may run off the UI thread.
+        # Float64 arrays are kept without a copy and must not be modified in place afterwards
+        with instrumentation.render("prepare_points"):
+            prepared = PreparedPoints(
+                np.asarray(L_values, dtype=np.float64),
+                np.asarray(a_values, dtype=np.float64),
+                np.asarray(b_values, dtype=np.float64),
+            )
+
+            if prepared.count > self.density_threshold:
+                # One image artist for the whole cloud; only selected points and outliers keep markers
+                with instrumentation.stage("bin_density"):
+                    prepared.density_counts = bin_density(prepared.a_values, prepared.b_values, self.density_bins)
+                with instrumentation.stage("outliers"):
+                    fit = fit_outliers(prepared.a_values, prepared.b_values)
+                    prepared.ab_mean, prepared.ab_inv_cov, prepared.outliers = fit
+                selected = self.selected[self.selected < prepared.count]
+                prepared.labelled = np.union1d(selected, prepared.outliers)
+            else:
+                prepared.labelled = np.arange(prepared.count)
+            prepared.L_counts = L_level_counts(prepared.L_values)
+
+            with instrumentation.stage("label_texts"):
+                points = (prepared.L_values, prepared.a_values, prepared.b_values)
+                prepared.label_texts = self._label_texts(prepared.labelled, points)
+            return prepared
+
+    def apply_points(self, prepared):
+        # Puts the result of prepare_points on the chart; only artist updates are left to do
+        with instrumentation.render("apply_points"):
+            self.L_values = prepared.L_values
+            self.a_values = prepared.a_values
+            self.b_values = prepared.b_values
+            self.density_counts = prepared.density_counts
+            self._ab_mean = prepared.ab_mean
+            self._ab_inv_cov = prepared.ab_inv_cov
+            self._outliers = prepared.outliers
+            self.selected = self.selected[self.selected < self.count]
+
+            if self.density:
+                self._update_density_image()
+            self.density_image.set_visible(self.density)
+            self.L_indicator.set_counts(prepared.L_counts)
+            self._set_labels(prepared.labelled, prepared.label_texts)
+            self.redraw()
+
+    def set_points(self, L_values, a_values, b_values):
+        # Replace every point; this needs a full redraw
+        with instrumentation.render("set_points"):
+            self.apply_points(self.prepare_points(L_values, a_values, b_values))
+
+    def select(self, indices):
+        # Points that should always be labelled, even in density mode
+        self.selected = np.unique(np.asarray(indices, dtype=np.intp))
+        if self.density:
+            self._set_labels(np.union1d(self.selected, self._outliers))
+            self.redraw()
+
+    def set_target(self, target, method="2000"):
+        # Mark a reference (L*, a*, b*) and add the delta E of every labelled point to its label
+        self.target = None if target is None else tuple(float(v) for v in target)
+        self.delta_e_method = method
+        if self.target is None:
+            self.target_marker.set_offsets(np.empty((0, 2)))
+        else:
+            self.target_marker.set_offsets([self.target[1:]])
+        self.overlays.set_tolerance([] if self.target is None else [self.target], self.overlays.tolerance, method)
+        self._set_labels(self.labelled)
+        self.redraw()
+
+    def set_tolerance(self, tolerance):
+        # Outline the colors within `tolerance` delta E of the target (None to remove it)
+        self.overlays.set_tolerance([] if self.target is None else [self.target], tolerance, self.delta_e_method)
+        self.redraw()
+
+    def set_slice_L(self, L):
+        # L* of the background slice, where the tolerance region and gamut outline are cut
+        self.overlays.set_L(L)
+        self.redraw()
+
+    def show_gamut(self, gamut="srgb"):
+        self.overlays.show_gamut(gamut, self.white)
+        self.redraw()
+
+    def classify(self, indices=slice(None)):
+        # In gamut and, with a tolerance, pass/fail for the given points (all by default)
+        return self.overlays.classify(self.L_values[indices], self.a_values[indices], self.b_values[indices])
+
+    def set_illuminant(self, illuminant="D65", observer=2):
+        # Illuminant and observer the L*a*b* values were measured under, for the marker colors
+        self.white = white_point(illuminant, observer)
+        self.scatter.set_facecolor(self._marker_colors(self.labelled))
+        # classify() and the gamut outline use the same white as the markers
+        self.overlays.show_gamut(self.overlays.gamut, self.white)
+        self.redraw()
+
+    def _marker_colors(self, indices):
+        return marker_colors(self.L_values[indices], self.a_values[indices], self.b_values[indices], self.white)
+
+    def delta_e(self, indices=slice(None)):
+        # Delta E from the target for the given points (all by default)
+        if self.target is None:
+            raise ValueError("No target color set")
+        return delta_e_to_target(
+            self.L_values[indices], self.a_values[indices], self.b_values[indices], self.target, self.delta_e_method
+        )
+
+    def set_swatches(self, index):
+        # Label points with their nearest swatch from a SwatchIndex (None to turn it off)
+        self.swatches = index
+        self._set_labels(self.labelled)
+        self.redraw()
+
+    def nearest_swatches(self, indices=slice(None)):
+        # Names and delta E of the nearest swatch for the given points (all by default)
+        return self._query_swatches(self.L_values[indices], self.a_values[indices], self.b_values[indices])
+
+    def _query_swatches(self, L_values, a_values, b_values):
+        lab = np.column_stack([L_values, a_values, b_values])
+        nearest, distances = self.swatches.query(lab, k=1, method=self.delta_e_method)
+        return self.swatches.name_of(nearest[:, 0]), distances[:, 0]
+
+    def _add_density_points(self, start, L_new, a_new, b_new):
+        # Only the cells the new points fall in are counted and put in the image
+        iy, ix = density_cells(a_new, b_new, self.density_bins)
+        np.add.at(self.density_counts, (iy, ix), 1)
+        image = self.density_image.get_array()
+        image[iy, ix] = self.density_counts[iy, ix]
+        self.density_image.changed()
+        # A new highest count rescales the colors of every cell
+        full = len(iy) > 0 and self.density_counts[iy, ix].max() > self.density_image.norm.vmax
+        if full:
+            self._update_density_image()
+
+        # New points are classified against the existing cloud, up to the label budget
+        room = MAX_OUTLIER_LABELS - len(self._outliers)
+        if room > 0:
+            d2 = outlier_distances(a_new, b_new, self._ab_mean, self._ab_inv_cov)
+            new_outliers = start + np.flatnonzero(d2 > OUTLIER_SIGMA**2)[:room]
+            if len(new_outliers):
+                self._outliers = np.concatenate([self._outliers, new_outliers])
+                self._set_labels(np.union1d(self.selected, self._outliers))
+                full = True
+
+        if full or self._blit_background is None:
+            self.redraw()
+            return
+        with instrumentation.stage("blit"):
+            self._blit_density(iy, ix, L_new)
+
+    def _plot_layers(self):
+        # The artists Axes.draw puts inside the plot area, in its order: the axes contribute
+        # only their grid lines, ticks and titles being outside it
+        layers = [self.ax.patch]
+        for artist in sorted(self.ax.get_children(), key=lambda artist: artist.get_zorder()):
+            if artist is self.ax.patch or artist.get_animated() or not artist.get_visible():
+                continue
+            if isinstance(artist, Axis):
+                layers.extend(artist.get_gridlines())
+            elif not isinstance(artist, Text):
+                layers.append(artist)
+        return layers
+
+    def _blit_density(self, iy, ix, L_new):
+        # Redraws the plot area over the changed density cells onto the cached canvas. The
+        # images are resampled for those cells only; whatever the other layers draw outside
+        # them is undone by putting the cached canvas back around the cells
+        canvas = self.fig.canvas
+        region = None
+        if len(iy):
+            step = 2.0 * AXIS_LIMIT / self.density_bins
+            corners = np.array([[ix.min(), iy.min()], [ix.max() + 1, iy.max() + 1]]) * step - AXIS_LIMIT
+            pixels = self.ax.transData.transform(corners)
+            pixels = np.array([np.floor(pixels.min(axis=0)) - 2, np.ceil(pixels.max(axis=0)) + 2])
+            region = Bbox.intersection(Bbox(pixels), self.ax.bbox)
+
+        canvas.restore_region(self._blit_background)
+        if region is not None:
+            for artist in self._plot_layers():
+                if isinstance(artist, AxesImage):
+                    # Resampled a little beyond the cells, as clipped images snap to whole pixels
+                    clip_box = artist.get_clip_box()
+                    artist.set_clip_box(Bbox.intersection(region.padded(2), clip_box or self.ax.bbox))
+                    self.ax.draw_artist(artist)
+                    artist.set_clip_box(clip_box)
+                elif artist is self.label_layer:
+                    self.label_layer.draw_within(region, canvas.get_renderer())
+                else:
+                    self.ax.draw_artist(artist)
+            cells = canvas.copy_from_bbox(region)
+            canvas.restore_region(self._blit_background)
+            canvas.restore_region(cells)
+        for artist in self.L_indicator.blit_artists(L_new):
+            self.colorbar.ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+
+        self._blit_background = canvas.copy_from_bbox(self.fig.bbox)
+        self.L_indicator.clear_pending()
+
+    def add_points(self, L_values, a_values, b_values):
+        L_new = np.atleast_1d(np.asarray(L_values, dtype=np.float64))
+        a_new = np.atleast_1d(np.asarray(a_values, dtype=np.float64))
+        b_new = np.atleast_1d(np.asarray(b_values, dtype=np.float64))
+        if len(L_new) == 0:
+            return
+        with instrumentation.render("add_points"):
+            self._extend(
+                np.concatenate([self.L_values, L_new]),
+                np.concatenate([self.a_values, a_new]),
+                np.concatenate([self.b_values, b_new]),
+            )
+
+    def _extend(self, L_values, a_values, b_values):
+        # The first self.count points of these arrays are the ones already shown; only the rest are drawn
+        start = self.count
+        L_new = L_values[start:]
+        a_new = a_values[start:]
+        b_new = b_values[start:]
+        self.L_values = L_values
+        self.a_values = a_values
+        self.b_values = b_values
+
+        if self.density:
+            self.L_indicator.add(L_new)
+            self._add_density_points(start, L_new, a_new, b_new)
+            return
+        if self.count > self.density_threshold:
+            # Crossing the threshold switches the whole chart to density mode
+            self.set_points(self.L_values, self.a_values, self.b_values)
+            return
+
+        # Keep the permanent artists complete for the next full draw; the markers already there
+        # keep their offsets and colors and only the new ones are converted
+        self.L_indicator.add(L_new)
+        new_offsets = np.column_stack([a_new, b_new])
+        new_colors = to_rgba_array(marker_colors(L_new, a_new, b_new, self.white))
+        offsets = self.scatter.get_offsets()
+        colors = self.scatter.get_facecolor()
+        if len(self.labelled) == start and len(offsets) == start and len(colors) == start:
+            offsets = np.concatenate([offsets, new_offsets])
+            colors = np.concatenate([colors, new_colors])
+        else:
+            offsets = np.column_stack([self.a_values, self.b_values])
+            colors = self._marker_colors(np.arange(self.count))
+        self.labelled = np.arange(self.count)
+        self.scatter.set_offsets(offsets)
+        self.scatter.set_facecolor(colors)
+        with instrumentation.stage("annotations"):
+            texts = self._label_texts(np.arange(start, self.count))
+            new_labels = self.label_layer.extend(a_new, b_new, texts) if texts else []
+
+        if self._blit_background is None:
+            self.redraw()
+            return
+
+        # Draw only the new points on top of the cached canvas
+        canvas = self.fig.canvas
+        self._pending_scatter.set_offsets(new_offsets)
+        self._pending_scatter.set_facecolor(new_colors)
+
+        with instrumentation.stage("blit"):
+            canvas.restore_region(self._blit_background)
+            self.ax.draw_artist(self._pending_scatter)
+            for label in new_labels:
+                self.ax.draw_artist(label)
+            for artist in self.L_indicator.blit_artists(L_new):
+                self.colorbar.ax.draw_artist(artist)
+            canvas.blit(self.fig.bbox)
+
+            # The canvas now shows the new points, so it becomes the cached background
+            self._blit_background = canvas.copy_from_bbox(self.fig.bbox)
+        self._pending_scatter.set_offsets(np.empty((0, 2)))
+        self.L_indicator.clear_pending()
+
+    def update_points(self, L_values, a_values, b_values):
+        # Sync with caller-owned columns that only grow, such as the views of a PointStore: the
+        # chart keeps the arrays without copying and draws the new tail, or starts over if they shrank
+        L_values = np.asarray(L_values, dtype=np.float64)
+        a_values = np.asarray(a_values, dtype=np.float64)
+        b_values = np.asarray(b_values, dtype=np.float64)
+        if len(L_values) < self.count:
+            self.set_points(L_values, a_values, b_values)
+        elif len(L_values) > self.count:
+            with instrumentation.render("add_points"):
+                self._extend(L_values, a_values, b_values)
+
+    def redraw(self):
+        self._blit_background = None
+        if self.auto_redraw:
+            self.fig.canvas.draw_idle()
+
+    def show(self):
+        plt.show(block=False)
+
+    def close(self):
+        plt.close(self.fig)
@@ -0,0 +1,168 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+from lab_chart import AXIS_LIMIT
+from lab_convert import marker_colors
+
+
+# Points drawn while the view is rotated or zoomed, and once it is still again
+INTERACTIVE_POINTS = 5000
+STILL_POINTS = 50000
+
+# Random subsampling is seeded, so the same data always shows the same points
+LOD_SEED = 0
+
+# Smallest voxel edge tried by voxel downsampling, in L*a*b* units
+MIN_VOXEL = 0.5
+
+LOD_MODES = ("random", "voxel")
+
+
+def random_levels(count, sizes, seed=LOD_SEED):
+    # Index arrays of each requested size from one seeded permutation, so every coarser level
+    # is a subset of the finer ones and points do not jump around when the level changes
+    if count <= min(sizes):
+        return [np.arange(count) for _ in sizes]
+    order = np.random.default_rng(seed).permutation(count)
+    return [np.sort(order[:size]) for size in sizes]
+
+
+def voxel_downsample(L_values, a_values, b_values, voxel):
+    # Mean L*a*b* and point count of every occupied voxel of edge `voxel`
+    cells = np.floor(np.column_stack([L_values, a_values, b_values]) / voxel).astype(np.int64) + (1 << 20)
+    keys = (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    means = [np.bincount(inverse, weights=values) / counts for values in (L_values, a_values, b_values)]
+    return means[0], means[1], means[2], counts
+
+
+def voxel_lod(L_values, a_values, b_values, target):
+    # Voxel downsampling with the voxel edge grown until at most `target` voxels are occupied;
+    # the first guess would fill the bounding box evenly, halved because real clouds are sparser
+    extent = [np.ptp(values) if len(values) else 0.0 for values in (L_values, a_values, b_values)]
+    voxel = max(MIN_VOXEL, 0.5 * float(np.cbrt(np.prod(np.maximum(extent, 1.0)) / target)))
+    for _ in range(12):
+        L, a, b, counts = voxel_downsample(L_values, a_values, b_values, voxel)
+        if len(counts) <= target:
+            break
+        # Occupied voxels shrink roughly with the cube of the edge
+        voxel *= max((len(counts) / target) ** (1.0 / 3.0), 1.1)
+    return L, a, b, counts
+
+
+class Level:
+    # One level of detail: the points to draw, their true colors and marker sizes
+
+    def __init__(self, L_values, a_values, b_values, sizes):
+        self.L_values = L_values
+        self.a_values = a_values
+        self.b_values = b_values
+        self.colors = marker_colors(L_values, a_values, b_values)
+        self.sizes = sizes
+
+    @property
+    def count(self):
+        return len(self.L_values)
+
+
+def prepare_levels(L_values, a_values, b_values, lod="random", sizes=(INTERACTIVE_POINTS, STILL_POINTS)):
+    # Coarse and fine Level for the point set; array work only, so it may run off the UI thread
+    L_values = np.asarray(L_values, dtype=np.float64)
+    a_values = np.asarray(a_values, dtype=np.float64)
+    b_values = np.asarray(b_values, dtype=np.float64)
+    if lod not in LOD_MODES:
+        raise ValueError(f"Unknown level of detail {lod!r}, expected one of {LOD_MODES}")
+
+    levels = []
+    if lod == "random" or len(L_values) == 0:
+        for indices in random_levels(len(L_values), sizes):
+            levels.append(Level(L_values[indices], a_values[indices], b_values[indices], 4.0))
+    else:
+        for size in sizes:
+            L, a, b, counts = voxel_lod(L_values, a_values, b_values, size)
+
+            # Marker area follows the number of points merged into each voxel
+            levels.append(Level(L, a, b, 4.0 * np.sqrt(counts / counts.mean())))
+    return levels
+
+
+class LabChart3D:
+    # a*, b* and L* in 3D. Two levels of detail are built once per point set: the coarse one is
+    # shown while a mouse button is held on the axes (rotating or zooming) and the fine one
+    # when the view is still, so interaction stays smooth on a CPU with millions of points
+
+    def __init__(self, fig=None, lod="random", interactive_points=INTERACTIVE_POINTS, still_points=STILL_POINTS):
+        self.fig = fig if fig is not None else plt.figure()
+        self.ax = self.fig.add_subplot(projection="3d")
+        self.lod = lod
+        self.sizes = (interactive_points, still_points)
+        self.closed = False
+        self.count = 0
+        self.levels = []
+        self.scatters = []
+        self.interacting = False
+
+        self.ax.set_xlabel("a*")
+        self.ax.set_ylabel("b*")
+        self.ax.set_zlabel("L*")
+        self.ax.set_xlim(-AXIS_LIMIT, AXIS_LIMIT)
+        self.ax.set_ylim(-AXIS_LIMIT, AXIS_LIMIT)
+        self.ax.set_zlim(0, 100)
+
+        self.fig.canvas.mpl_connect("button_press_event", self._on_press)
+        self.fig.canvas.mpl_connect("button_release_event", self._on_release)
+        self.fig.canvas.mpl_connect("close_event", self._on_close)
+
+    def prepare_points(self, L_values, a_values, b_values):
+        return len(L_values), prepare_levels(L_values, a_values, b_values, self.lod, self.sizes)
+
+    def apply_points(self, prepared):
+        self.count, self.levels = prepared
+        for scatter in self.scatters:
+            scatter.remove()
+
+        # Colors are fixed per point, so depth shading (recomputed every frame) is off
+        self.scatters = [
+            self.ax.scatter(
+                level.a_values,
+                level.b_values,
+                level.L_values,
+                c=level.colors,
+                s=level.sizes,
+                depthshade=False,
+                linewidths=0,
+            )
+            for level in self.levels
+        ]
+        self._show_level()
+
+    def set_points(self, L_values, a_values, b_values):
+        self.apply_points(self.prepare_points(L_values, a_values, b_values))
+
+    def _show_level(self):
+        shown = 0 if self.interacting else len(self.scatters) - 1
+        for i, scatter in enumerate(self.scatters):
+            scatter.set_visible(i == shown)
+        if self.scatters:
+            self.ax.set_title(f"CIELab 3D: {self.levels[shown].count:,} of {self.count:,} points ({self.lod})")
+        self.fig.canvas.draw_idle()
+
+    def _on_press(self, event):
+        if event.inaxes is self.ax and not self.interacting:
+            self.interacting = True
+            self._show_level()
+
+    def _on_release(self, event):
+        if self.interacting:
+            self.interacting = False
+            self._show_level()
+
+    def _on_close(self, event):
+        self.closed = True
+
+    def show(self):
+        plt.show(block=False)
+
+    def close(self):
+        plt.close(self.fig)
@@ -0,0 +1,166 @@
+import numpy as np
+
+
+# CIE standard illuminant D65, 2° observer
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# Reference whites (Y = 1) by illuminant and observer in degrees (ASTM E308)
+WHITES = {
+    ("D65", 2): D65_WHITE,
+    ("D65", 10): np.array([0.94811, 1.0, 1.07304]),
+    ("D50", 2): np.array([0.96422, 1.0, 0.82521]),
+    ("D50", 10): np.array([0.96720, 1.0, 0.81427]),
+}
+
+# sRGB is defined for D65 and the 2° observer; other whites are adapted to it
+SRGB_WHITE = D65_WHITE
+
+# Bradford cone response matrix for chromatic adaptation
+BRADFORD = np.array(
+    [
+        [0.8951, 0.2664, -0.1614],
+        [-0.7502, 1.7135, 0.0367],
+        [0.0389, -0.0685, 1.0296],
+    ]
+)
+
+# Linear sRGB primaries (IEC 61966-2-1)
+XYZ_TO_LINEAR_SRGB = np.array(
+    [
+        [3.2404542, -1.5371385, -0.4985314],
+        [-0.9692660, 1.8760108, 0.0415560],
+        [0.0556434, -0.2040259, 1.0572252],
+    ]
+)
+
+_EPSILON = 216.0 / 24389.0
+_KAPPA = 24389.0 / 27.0
+
+
+def lab_to_xyz(lab, white=D65_WHITE):
+    # lab is any array with a trailing axis of (L*, a*, b*)
+    lab = np.asarray(lab, dtype=np.float64)
+    L, a, b = lab[..., 0], lab[..., 1], lab[..., 2]
+
+    fy = (L + 16.0) / 116.0
+    fx = fy + a / 500.0
+    fz = fy - b / 200.0
+
+    fx3 = fx**3
+    fz3 = fz**3
+    x = np.where(fx3 > _EPSILON, fx3, (116.0 * fx - 16.0) / _KAPPA)
+    y = np.where(L > _KAPPA * _EPSILON, fy**3, L / _KAPPA)
+    z = np.where(fz3 > _EPSILON, fz3, (116.0 * fz - 16.0) / _KAPPA)
+
+    return np.stack([x, y, z], axis=-1) * white
+
+
+LINEAR_SRGB_TO_XYZ = np.linalg.inv(XYZ_TO_LINEAR_SRGB)
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def white_point(illuminant="D65", observer=2):
+    try:
+        return WHITES[(str(illuminant).upper(), int(observer))]
+    except KeyError:
+        raise ValueError(
+            f"Unknown illuminant/observer {illuminant}/{observer}°, expected one of "
+            + ", ".join(f"{name}/{degrees}°" for name, degrees in WHITES)
+        ) from None
+
+
+def xyz_to_lab(xyz, white=D65_WHITE):
+    # Inverse of lab_to_xyz, over any array with a trailing axis of (X, Y, Z)
+    t = np.asarray(xyz, dtype=np.float64) / white
+    f = np.where(t > _EPSILON, np.cbrt(t), (_KAPPA * t + 16.0) / 116.0)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack([116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)], axis=-1)
+
+
+def adaptation_matrix(source_white, target_white):
+    # Bradford transform taking XYZ under source_white to the corresponding colors under target_white
+    source = BRADFORD @ np.asarray(source_white, dtype=np.float64)
+    target = BRADFORD @ np.asarray(target_white, dtype=np.float64)
+    return np.linalg.inv(BRADFORD) @ np.diag(target / source) @ BRADFORD
+
+
+def adapt(xyz, source_white, target_white):
+    xyz = np.asarray(xyz, dtype=np.float64)
+    if np.array_equal(source_white, target_white):
+        return xyz
+    return xyz @ adaptation_matrix(source_white, target_white).T
+
+
+def xyz_to_linear_srgb(xyz):
+    return np.asarray(xyz, dtype=np.float64) @ XYZ_TO_LINEAR_SRGB.T
+
+
+def linear_srgb_to_xyz(rgb):
+    return np.asarray(rgb, dtype=np.float64) @ LINEAR_SRGB_TO_XYZ.T
+
+
+def linear_to_srgb(rgb):
+    # sRGB transfer function; negative values are kept so callers can still detect them
+    rgb = np.asarray(rgb, dtype=np.float64)
+    magnitude = np.abs(rgb)
+    encoded = np.where(magnitude <= 0.0031308, 12.92 * magnitude, 1.055 * magnitude ** (1.0 / 2.4) - 0.055)
+    return np.copysign(encoded, rgb)
+
+
+def srgb_to_linear(rgb):
+    rgb = np.asarray(rgb, dtype=np.float64)
+    magnitude = np.abs(rgb)
+    decoded = np.where(magnitude <= 0.04045, magnitude / 12.92, ((magnitude + 0.055) / 1.055) ** 2.4)
+    return np.copysign(decoded, rgb)
+
+
+def lab_to_srgb(lab, white=D65_WHITE):
+    # Unclipped sRGB in [0, 1] for in-gamut colors; L*a*b* relative to other whites is
+    # Bradford-adapted to D65 first
+    return linear_to_srgb(xyz_to_linear_srgb(adapt(lab_to_xyz(lab, white), white, SRGB_WHITE)))
+
+
+def srgb_to_lab(rgb, white=D65_WHITE):
+    return xyz_to_lab(adapt(linear_srgb_to_xyz(srgb_to_linear(rgb)), SRGB_WHITE, white), white)
+
+
+def srgb_to_hex(rgb):
+    # "#rrggbb" strings for an array of sRGB triplets, clipped to the gamut; built from byte
+    # tables rather than formatted one by one
+    rgb = np.asarray(rgb, dtype=np.float64)
+    codes = np.round(np.clip(rgb, 0.0, 1.0) * 255.0).astype(np.uint8).reshape(-1, 3)
+    chars = np.empty((len(codes), 7), dtype=np.uint8)
+    chars[:, 0] = ord("#")
+    chars[:, 1::2] = _HEX_DIGITS[codes >> 4]
+    chars[:, 2::2] = _HEX_DIGITS[codes & 15]
+    return chars.view("S7").ravel().astype("U7").reshape(rgb.shape[:-1])
+
+
+def lab_to_hex(lab, white=D65_WHITE):
+    return srgb_to_hex(lab_to_srgb(lab, white))
+
+
+def marker_colors(L_values, a_values, b_values, white=D65_WHITE):
+    # RGB fill for chart markers; colors outside sRGB are clipped to its nearest edge
+    lab = np.column_stack([L_values, a_values, b_values])
+    return np.clip(lab_to_srgb(lab, white), 0.0, 1.0)
+
+
+CONVERSIONS = {
+    "xyz": lab_to_xyz,
+    "srgb": lab_to_srgb,
+    "hex": lab_to_hex,
+}
+
+
+def convert(lab, to="srgb", illuminant="D65", observer=2):
+    # L*a*b* measured under the given illuminant and observer to XYZ (same white), sRGB or hex
+    if to not in CONVERSIONS:
+        raise ValueError(f"Unknown conversion {to!r}, expected one of {', '.join(CONVERSIONS)}")
+    return CONVERSIONS[to](lab, white_point(illuminant, observer))
+
+
+def in_srgb_gamut(rgb, tolerance=1e-6):
+    rgb = np.asarray(rgb)
+    return np.all((rgb >= -tolerance) & (rgb <= 1.0 + tolerance), axis=-1)
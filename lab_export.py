@@ -0,0 +1,190 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from delta_e import delta_e_to_target
+from lab_convert import D65_WHITE, in_srgb_gamut, lab_to_hex, lab_to_srgb
+
+
+FIGURE_FORMATS = ("png", "svg", "pdf")
+DATA_FORMATS = ("csv", "parquet")
+
+# Threads encoding and writing exports; figures are still drawn one at a time by the caller
+ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Points per Parquet row group and per CSV block; metrics are computed one block at a time
+ROW_GROUP_ROWS = 65536
+
+
+def export_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt == "pq":
+        fmt = "parquet"
+    if fmt not in FIGURE_FORMATS + DATA_FORMATS:
+        raise ValueError(f"Cannot export {fmt!r}, expected one of {', '.join(FIGURE_FORMATS + DATA_FORMATS)}")
+    return fmt
+
+
+def snapshot_figure(fig, fmt="png", dpi=None):
+    # The part of saving that needs the figure, done on the calling thread since Matplotlib
+    # figures are not thread-safe: PNG is rasterized to RGBA and compressed later by
+    # write_snapshot; SVG and PDF come back as the finished file, only the write is left
+    dpi = dpi if dpi is not None else fig.dpi
+    buffer = io.BytesIO()
+    if fmt == "png":
+        fig.savefig(buffer, format="raw", dpi=dpi)
+        width, height = (int(value) for value in fig.get_size_inches() * dpi)
+        return fmt, dpi, (width, height), buffer.getvalue()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    return fmt, dpi, None, buffer.getvalue()
+
+
+def write_snapshot(snapshot, path):
+    fmt, dpi, size, data = snapshot
+    if fmt == "png":
+        # Pillow releases the GIL while it compresses, so several PNGs encode in parallel
+        from PIL import Image
+
+        image = Image.frombuffer("RGBA", size, data, "raw", "RGBA", 0, 1)
+        image.save(path, format="PNG", dpi=(dpi, dpi))
+    else:
+        with open(path, "wb") as f:
+            f.write(data)
+    return path
+
+
+def point_batches(
+    L_values, a_values, b_values, target=None, method="2000", tolerance=None, white=D65_WHITE, rows=ROW_GROUP_ROWS
+):
+    # The points with their metrics as Arrow record batches of `rows` points: sRGB hex, in_gamut,
+    # and with a target delta_e and, with a tolerance, passed
+    import pyarrow as pa
+
+    for start in range(0, max(len(L_values), 1), rows):
+        block = slice(start, start + rows)
+        L = np.asarray(L_values[block], dtype=np.float64)
+        a = np.asarray(a_values[block], dtype=np.float64)
+        b = np.asarray(b_values[block], dtype=np.float64)
+        lab = np.column_stack([L, a, b])
+
+        columns = {"L": L, "a": a, "b": b}
+        columns["hex"] = lab_to_hex(lab, white)
+        columns["in_gamut"] = in_srgb_gamut(lab_to_srgb(lab, white))
+        if target is not None:
+            distances = delta_e_to_target(L, a, b, target, method)
+            columns["delta_e"] = distances
+            if tolerance is not None:
+                columns["passed"] = distances <= tolerance
+        yield pa.RecordBatch.from_pydict({name: pa.array(values) for name, values in columns.items()})
+
+
+def write_points(path, L_values, a_values, b_values, fmt=None, **metrics):
+    # Streams the points and their metrics to CSV or Parquet, one block at a time, so a
+    # million points never need all their metric columns in memory at once. Returns `path`
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    fmt = export_format(path, fmt)
+    writer = None
+    try:
+        for batch in point_batches(L_values, a_values, b_values, **metrics):
+            if writer is None:
+                if fmt == "parquet":
+                    writer = pq.ParquetWriter(path, batch.schema)
+                else:
+                    writer = pacsv.CSVWriter(path, batch.schema)
+            if fmt == "parquet":
+                # One row group per block, which readers can skip through or stream back
+                writer.write_batch(batch, row_group_size=batch.num_rows)
+            else:
+                writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def chart_metrics(chart):
+    # Metric options of write_points matching what a LabChart shows
+    return {
+        "target": chart.target,
+        "method": chart.delta_e_method,
+        "tolerance": chart.overlays.tolerance,
+        "white": chart.white,
+    }
+
+
+def prepare_save(chart, path, dpi=None):
+    # UI-thread half of saving a chart or its points to `path` (the format follows the extension).
+    # Returns the rest as a callable that may run on any thread and returns `path`
+    fmt = export_format(path)
+    if fmt in FIGURE_FORMATS:
+        return partial(write_snapshot, snapshot_figure(chart.fig, fmt, dpi), path)
+    # The chart replaces its arrays rather than modifying them, so the worker may keep reading them
+    return partial(write_points, path, chart.L_values, chart.a_values, chart.b_values, fmt, **chart_metrics(chart))
+
+
+class ChartExporter:
+    # Bulk exports: figures are snapshotted by the caller, who can then move on to the next
+    # chart while a thread pool compresses and writes the files
+
+    def __init__(self, workers=ENCODE_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self._futures = []
+
+    def save_figure(self, fig, path, fmt=None, dpi=None):
+        snapshot = snapshot_figure(fig, export_format(path, fmt), dpi)
+        return self._submit(write_snapshot, snapshot, path)
+
+    def save_points(self, path, L_values, a_values, b_values, fmt=None, **metrics):
+        return self._submit(write_points, path, L_values, a_values, b_values, fmt, **metrics)
+
+    def _submit(self, work, *args, **kwargs):
+        future = self._executor.submit(work, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        # Paths written since the last wait, in submission order; raises the first failure
+        futures, self._futures = self._futures, []
+        return [future.result() for future in futures]
+
+    def close(self):
+        try:
+            return self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PdfReport:
+    # Multi-page PDF written page by page: each figure is rendered into the file when added, so
+    # a report of many charts holds one figure, reused, rather than one per page
+
+    def __init__(self, path, title=None):
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        self.path = path
+        self._pdf = PdfPages(path, metadata={"Title": title} if title else None)
+        self.pages = 0
+
+    def add(self, fig):
+        self._pdf.savefig(fig)
+        self.pages += 1
+
+    def close(self):
+        self._pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
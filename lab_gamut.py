@@ -0,0 +1,127 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from lab_cache import cached_array
+from lab_convert import in_srgb_gamut, lab_to_srgb
+
+
+# Bump when the rendering changes so stale cache files are not reused
+CACHE_VERSION = 2
+
+# a*/b* range covered by every slice, matching the chart axes
+AB_EXTENT = 100
+
+# Larger slices are rendered one L* level at a time, when first needed, instead of as a whole
+# table: 101 levels at 1024 x 1024 would take 400 MB
+TABLE_LIMIT = 256
+
+# Large slices kept open; the rest are mapped again from the disk cache
+SLICE_CACHE_SIZE = 8
+
+_slices_cache = {}
+_slices_lock = threading.Lock()
+_slice_cache = OrderedDict()
+_slice_lock = threading.Lock()
+
+
+def render_lab_slice(L, size=256, extent=AB_EXTENT):
+    # a* runs left to right and b* bottom to top, top row first as expected by imshow
+    coords = np.linspace(-extent, extent, size)
+    a, b = np.meshgrid(coords, coords[::-1])
+
+    lab = np.empty((size, size, 3))
+    lab[..., 0] = L
+    lab[..., 1] = a
+    lab[..., 2] = b
+    rgb = lab_to_srgb(lab)
+
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    rgba[..., :3] = np.round(np.clip(rgb, 0.0, 1.0) * 255.0)
+
+    # Colors that sRGB cannot reproduce are left transparent
+    rgba[..., 3] = np.where(in_srgb_gamut(rgb), 255, 0)
+
+    return rgba
+
+
+class LabSlices:
+    def __init__(self, slices, step):
+        self.slices = slices
+        self.step = step
+
+    def nearest(self, L):
+        # Constant-time lookup of the slice closest to L*
+        index = int(round(_finite_L(L) / self.step))
+        return self.slices[min(max(index, 0), len(self.slices) - 1)]
+
+
+def _build_slices(size, step):
+    L_levels = np.arange(0.0, 100.0 + step / 2.0, step)
+    slices = np.empty((len(L_levels), size, size, 4), dtype=np.uint8)
+    for i, L in enumerate(L_levels):
+        slices[i] = render_lab_slice(L, size)
+    return slices
+
+
+def lab_slices(size=256, step=1.0):
+    key = (int(size), float(step))
+
+    with _slices_lock:
+        cached = _slices_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Memory-mapped from the shared cache directory, built by the first process to need it
+        params = {"version": CACHE_VERSION, "size": key[0], "step": key[1], "extent": AB_EXTENT}
+        slices = cached_array("lab_slices", params, lambda: _build_slices(*key))
+        slices.flags.writeable = False
+        cached = _slices_cache[key] = LabSlices(slices, key[1])
+        return cached
+
+
+def _finite_L(L):
+    L = float(L)
+    if not math.isfinite(L):
+        raise ValueError(f"No slice at L* {L}")
+    return L
+
+
+def lab_slice(L, size, step=1.0):
+    # One slice at L* rounded to `step`, rendered once and then mapped from the disk cache
+    L = min(max(round(_finite_L(L) / step) * step, 0.0), 100.0)
+    key = (int(size), L)
+
+    with _slice_lock:
+        rgba = _slice_cache.get(key)
+        if rgba is not None:
+            _slice_cache.move_to_end(key)
+            return rgba
+
+        params = {"version": CACHE_VERSION, "size": key[0], "L": L, "extent": AB_EXTENT}
+        rgba = cached_array("lab_slice", params, lambda: render_lab_slice(L, key[0]))
+        rgba.flags.writeable = False
+        _slice_cache[key] = rgba
+        if len(_slice_cache) > SLICE_CACHE_SIZE:
+            _slice_cache.popitem(last=False)
+        return rgba
+
+
+class SliceCache:
+    # Same lookup as LabSlices for sizes above TABLE_LIMIT, backed by lab_slice
+
+    def __init__(self, size, step):
+        self.size = size
+        self.step = step
+
+    def nearest(self, L):
+        return lab_slice(L, self.size, self.step)
+
+
+def backgrounds(size=256, step=1.0):
+    # Background lookup for a slice size: a precomputed table up to TABLE_LIMIT, single slices above
+    if size <= TABLE_LIMIT:
+        return lab_slices(size, step)
+    return SliceCache(int(size), float(step))
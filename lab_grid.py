@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+from delta_e import delta_e_to_target
+from lab_chart import AXIS_LIMIT
+from lab_chart3d import random_levels
+
+
+# Points drawn per panel; larger lots are subsampled (seeded, so reruns match)
+PANEL_POINTS = 2000
+
+# Points are colored by L* in this many gray steps; each step is drawn as one single-color
+# scatter, which Agg stamps far faster than a scatter with a color per point
+L_STEPS = 10
+
+# Panel edge in inches and the gap between panels as a share of the panel
+PANEL_SIZE = 1.6
+PANEL_GAP = 0.12
+
+
+class LabGrid:
+    # Small multiples: one a*b* panel per lot in a single figure. Every panel lives in one
+    # shared axes at its own offset, so a hundred lots cost one background image, L_STEPS
+    # scatters, one line collection and one colorbar, all drawn in a single pass, instead of a
+    # hundred axes with their own ticks, images and colorbars
+
+    def __init__(self, background, columns=None, panel_size=PANEL_SIZE, max_points=PANEL_POINTS):
+        self.background = background
+        self.columns = columns
+        self.panel_size = panel_size
+        self.max_points = max_points
+        self.fig = None
+        self.ax = None
+        self.names = []
+
+    def _layout(self, count):
+        columns = self.columns or max(1, math.ceil(math.sqrt(count)))
+        rows = max(1, math.ceil(count / columns))
+        return rows, columns
+
+    def _tiled_background(self, rows, columns):
+        # The slice is decoded once and repeated with transparent gutters: one image for all
+        # panels. Returns it with the panel pitch in a*b* units, which the gutter's whole pixels set
+        size = self.background.shape[0]
+        gutter = int(round(size * PANEL_GAP))
+        cell = np.zeros((size + gutter, size + gutter, 4), dtype=self.background.dtype)
+        cell[:size, :size] = self.background
+        tiled = np.tile(cell, (rows, columns, 1))
+        pitch = 2.0 * AXIS_LIMIT * (size + gutter) / size
+        return tiled[: rows * (size + gutter) - gutter, : columns * (size + gutter) - gutter], pitch
+
+    def set_panels(self, panels, target=None, method="2000"):
+        # panels: (name, L, a, b) per lot, in display order. Returns the figure
+        panels = list(panels)
+        rows, columns = self._layout(len(panels))
+        self.names = [name for name, _, _, _ in panels]
+
+        if self.fig is not None:
+            plt.close(self.fig)
+        width = columns * self.panel_size + 1.0
+        height = rows * self.panel_size + 0.4
+        box = [0.2 / width, 0.2 / height, columns * self.panel_size / width, rows * self.panel_size / height]
+        self.fig = plt.figure(figsize=(width, height))
+        ax = self.fig.add_axes(box)
+        ax.set_axis_off()
+
+        # Panel (r, c) has its a*b* origin at (x0, y0); row 0 is at the top
+        background, pitch = self._tiled_background(rows, columns)
+        x0 = (np.arange(len(panels)) % columns) * pitch + AXIS_LIMIT
+        y0 = -(np.arange(len(panels)) // columns) * pitch - AXIS_LIMIT
+        right = (columns - 1) * pitch + 2 * AXIS_LIMIT
+        bottom = -(rows - 1) * pitch - 2 * AXIS_LIMIT
+        ax.imshow(background, extent=[0, right, bottom, 0], interpolation="nearest")
+
+        # Frames and zero lines of every panel in one collection
+        segments = []
+        for x, y in zip(x0.tolist(), y0.tolist()):
+            left, right_edge = x - AXIS_LIMIT, x + AXIS_LIMIT
+            bottom_edge, top = y - AXIS_LIMIT, y + AXIS_LIMIT
+            segments.append([(left, top), (right_edge, top), (right_edge, bottom_edge), (left, bottom_edge), (left, top)])
+            segments.append([(x, top), (x, bottom_edge)])
+            segments.append([(left, y), (right_edge, y)])
+        ax.add_collection(LineCollection(segments, colors="black", linewidths=0.4, alpha=0.6))
+
+        # All panels' points together, colored by L* step against the shared colorbar
+        xs, ys, Ls = [], [], []
+        for i, (name, L, a, b) in enumerate(panels):
+            L, a, b = (np.asarray(values, dtype=np.float64) for values in (L, a, b))
+            title = f"{name} (n={len(L)})"
+            if target is not None and len(L):
+                title += f" ΔE {delta_e_to_target(L, a, b, target, method).mean():.1f}"
+            ax.text(x0[i], y0[i] + AXIS_LIMIT * 1.03, title, ha="center", va="bottom", fontsize=6, clip_on=False)
+
+            # Points outside the a*b* range would land in a neighbouring panel
+            inside = np.flatnonzero((np.abs(a) <= AXIS_LIMIT) & (np.abs(b) <= AXIS_LIMIT))
+            if len(inside) > self.max_points:
+                inside = inside[random_levels(len(inside), (self.max_points,))[0]]
+            xs.append(a[inside] + x0[i])
+            ys.append(b[inside] + y0[i])
+            Ls.append(L[inside])
+
+        x = np.concatenate(xs) if xs else np.empty(0)
+        y = np.concatenate(ys) if ys else np.empty(0)
+        L = np.concatenate(Ls) if Ls else np.empty(0)
+        steps = np.clip(L * L_STEPS // 100, 0, L_STEPS - 1).astype(np.intp)
+        cmap = plt.get_cmap("gray").resampled(L_STEPS)
+        for step in range(L_STEPS):
+            mask = steps == step
+            if mask.any():
+                # Rasterized, so vector exports do not carry hundreds of thousands of markers
+                ax.scatter(x[mask], y[mask], color=cmap(step), s=4, edgecolors="black", linewidths=0.2, rasterized=True)
+        if target is not None:
+            ax.scatter(x0 + target[1], y0 + target[2], marker="X", color="red", edgecolors="white", s=20, zorder=3)
+
+        ax.set_xlim(-0.02 * pitch, right + 0.02 * pitch)
+        ax.set_ylim(bottom - 0.02 * pitch, AXIS_LIMIT * 0.15)
+        ax.set_aspect("equal")
+
+        cax = self.fig.add_axes([1.0 - 0.6 / width, box[1], 0.15 / width, box[3]])
+        self.fig.colorbar(plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(0, 100)), cax=cax).set_label("L*")
+        self.ax = ax
+        return self.fig
+
+    def savefig(self, path, **kwargs):
+        self.fig.savefig(path, **kwargs)
+
+    def close(self):
+        if self.fig is not None:
+            plt.close(self.fig)
+            self.fig = None
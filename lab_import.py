@@ -0,0 +1,256 @@
+import csv
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+
+# Rows per streamed chunk
+CHUNK_ROWS = 65536
+
+# Leading lines searched for the header row when the number of metadata lines is not given
+HEADER_SEARCH_LINES = 100
+
+CSV_EXTENSIONS = (".csv", ".txt", ".tsv")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+# Accepted header spellings, compared after lowercasing and dropping everything but letters/digits
+_COLUMN_ALIASES = {
+    "L": ("l", "lstar", "ciel", "labl", "lightness"),
+    "a": ("a", "astar", "ciea", "laba"),
+    "b": ("b", "bstar", "cieb", "labb"),
+}
+
+
+class ImportStats:
+    def __init__(self):
+        self.rows = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self):
+        megabytes = self.bytes / 1e6
+        return (
+            f"Imported {self.rows} points in {self.seconds:.3f} s "
+            f"({self.rows_per_second:,.0f} rows/s, {megabytes / max(self.seconds, 1e-9):.1f} MB/s, "
+            f"{self.chunks} chunks, {self.dropped} incomplete rows dropped)"
+        )
+
+
+def _normalize(name):
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+def find_lab_columns(names):
+    # Map the L*, a* and b* columns onto the file's own header names
+    normalized = {_normalize(name): name for name in names}
+    columns = []
+    for key, aliases in _COLUMN_ALIASES.items():
+        match = next((normalized[alias] for alias in aliases if alias in normalized), None)
+        if match is None:
+            raise ValueError(f"No {key}* column found in {list(names)}")
+        columns.append(match)
+    return columns
+
+
+def _is_header(fields, columns):
+    if columns is not None:
+        return all(name in fields for name in columns)
+    try:
+        find_lab_columns(fields)
+    except ValueError:
+        return False
+    return True
+
+
+def _find_header(path, columns):
+    # Instrument exports often start with metadata lines (instrument, date, illuminant...); the
+    # header is the first line that names the L*a*b* columns, whichever separator the file uses.
+    # Returns the number of lines before it, 0 when no line matches
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for index, line in enumerate(f):
+            if index == HEADER_SEARCH_LINES:
+                break
+            for delimiter in ",;\t|":
+                if _is_header(next(csv.reader([line], delimiter=delimiter), []), columns):
+                    return index
+    return 0
+
+
+def _sniff_csv(path, skip_rows):
+    # Instrument exports are often ';'-separated with decimal commas
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for _ in range(skip_rows):
+            f.readline()
+        sample = f.read(65536)
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+
+    lines = sample.splitlines()
+    header = next(csv.reader(lines[:1], delimiter=delimiter)) if lines else []
+    data = "\n".join(lines[1:])
+    decimal_point = "," if delimiter != "," and re.search(r"\d,\d", data) else "."
+
+    return delimiter, decimal_point, header
+
+
+def _to_columns(batch, columns, group_by, stats):
+    L, a, b = (
+        batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64, copy=False) for name in columns
+    )
+    groups = None
+    if group_by is not None:
+        groups = batch.column(group_by).to_numpy(zero_copy_only=False).astype(str)
+
+    # Rows with a missing value cannot be plotted
+    valid = np.isfinite(L) & np.isfinite(a) & np.isfinite(b)
+    if not valid.all():
+        stats.dropped += int(np.count_nonzero(~valid))
+        L, a, b = L[valid], a[valid], b[valid]
+        if groups is not None:
+            groups = groups[valid]
+
+    stats.rows += len(L)
+    stats.chunks += 1
+    return (L, a, b) if groups is None else (L, a, b, groups)
+
+
+def _iter_csv(path, columns, group_by, chunk_rows, skip_rows, delimiter, decimal_point, stats):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    if skip_rows is None:
+        skip_rows = _find_header(path, columns)
+    sniffed_delimiter, sniffed_decimal, header = _sniff_csv(path, skip_rows)
+    delimiter = delimiter or sniffed_delimiter
+    decimal_point = decimal_point or sniffed_decimal
+    columns = columns or find_lab_columns(header)
+
+    # Only the L*a*b* columns (and the group column) are parsed, L*a*b* straight into float64
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(skip_rows=skip_rows, block_size=max(chunk_rows * 32, 1 << 20)),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(columns) + ([group_by] if group_by is not None else []),
+            column_types={name: pa.float64() for name in columns},
+            decimal_point=decimal_point,
+        ),
+    )
+    for batch in reader:
+        yield _to_columns(batch, columns, group_by, stats)
+
+
+def _iter_parquet(path, columns, group_by, chunk_rows, stats):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    columns = columns or find_lab_columns(parquet_file.schema_arrow.names)
+    read_columns = list(columns) + ([group_by] if group_by is not None else [])
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=read_columns):
+        yield _to_columns(batch, columns, group_by, stats)
+
+
+def iter_lab_chunks(
+    path,
+    columns=None,
+    group_by=None,
+    chunk_rows=CHUNK_ROWS,
+    skip_rows=None,
+    delimiter=None,
+    decimal_point=None,
+    stats=None,
+):
+    # Yields (L, a, b) float64 arrays one chunk at a time, plus the group labels when group_by is set.
+    # skip_rows=None finds the header row of a CSV file itself
+    stats = stats if stats is not None else ImportStats()
+    stats.bytes += os.path.getsize(path)
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        chunks = _iter_parquet(path, columns, group_by, chunk_rows, stats)
+    elif extension in CSV_EXTENSIONS:
+        chunks = _iter_csv(path, columns, group_by, chunk_rows, skip_rows, delimiter, decimal_point, stats)
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        stats.seconds = time.perf_counter() - start
+        yield chunk
+    stats.seconds = time.perf_counter() - start
+
+
+def import_lab_file(path, on_chunk=None, **options):
+    # Reads a whole file into three columnar arrays and returns them with the parse statistics
+    stats = ImportStats()
+    L_chunks, a_chunks, b_chunks = [], [], []
+    for L, a, b in iter_lab_chunks(path, stats=stats, **options):
+        L_chunks.append(L)
+        a_chunks.append(a)
+        b_chunks.append(b)
+        if on_chunk is not None:
+            on_chunk(L, a, b, stats)
+
+    if not L_chunks:
+        empty = np.empty(0)
+        return empty, empty.copy(), empty.copy(), stats
+    return np.concatenate(L_chunks), np.concatenate(a_chunks), np.concatenate(b_chunks), stats
+
+
+def import_lab_groups(path, group_by, **options):
+    # Splits a file into {group: (L, a, b)}, e.g. one entry per production lot
+    stats = ImportStats()
+    chunks = list(iter_lab_chunks(path, group_by=group_by, stats=stats, **options))
+    if not chunks:
+        return {}, stats
+
+    L, a, b, groups = (np.concatenate(column) for column in zip(*chunks))
+    names, inverse = np.unique(groups, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(len(names) + 1))
+
+    result = {}
+    for i, name in enumerate(names.tolist()):
+        rows = order[bounds[i] : bounds[i + 1]]
+        result[name] = (L[rows], a[rows], b[rows])
+    return result, stats
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import L*a*b* measurements from CSV or Parquet files.")
+    parser.add_argument("paths", nargs="+", help="CSV/TXT/TSV or Parquet files")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--skip-rows", type=int, help="Metadata lines before the CSV header (found by default)")
+    parser.add_argument("--show", action="store_true", help="Plot the imported points")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        L, a, b, stats = import_lab_file(path, chunk_rows=args.chunk_rows, skip_rows=args.skip_rows)
+        print(f"{path}: {stats}")
+
+        if args.show and len(L):
+            import matplotlib.pyplot as plt
+            from lab_chart import LabChart
+            from lab_gamut import lab_slices
+
+            chart = LabChart(lab_slices().nearest(L[-1]))
+            chart.set_points(L, a, b)
+            plt.show()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+
+
+# L* values are counted on this grid, far finer than the colorbar's pixels
+L_MARKER_RESOLUTION = 0.1
+L_LEVELS = int(round(100 / L_MARKER_RESOLUTION)) + 1
+
+# Histogram bar height and the width of the density kernel, in L*
+HISTOGRAM_BIN = 1.0
+DENSITY_SIGMA = 1.5
+
+# markers: a tick at every occupied L*; histogram and density: the distribution of L* as a
+# curve across the bar, full width at its most common L*
+MODES = ("markers", "histogram", "density")
+
+_LINE_WIDTHS = {"markers": 5.0, "histogram": 1.5, "density": 1.5}
+
+
+def L_level_index(L_values):
+    # Position of each L* on the L_MARKER_RESOLUTION grid; NaN and infinite L* have none and are left out
+    L_values = np.asarray(L_values, dtype=np.float64)
+    L_values = L_values[np.isfinite(L_values)]
+    levels = L_LEVELS - 1
+    return np.clip(np.round(L_values / L_MARKER_RESOLUTION), 0, levels).astype(np.intp)
+
+
+def L_level_counts(L_values):
+    return np.bincount(L_level_index(L_values), minlength=L_LEVELS)
+
+
+class LIndicator:
+    # The L* of a chart's points on its colorbar, as a single LineCollection built from the
+    # count of points per L* level: its size is bounded by the levels, not by the points, and
+    # adding points only adds to the counts
+
+    def __init__(self, cax, mode="markers", backdrop=None):
+        self.cax = cax
+        # Artist under the indicator (the colorbar's color ramp); it is redrawn to erase the old
+        # curve when only the colorbar is blitted
+        self.backdrop = backdrop
+        self.counts = np.zeros(L_LEVELS, dtype=np.int64)
+
+        self.collection = LineCollection([], colors="red")
+        # New markers only, drawn over the cached canvas by the chart's blitting
+        self.pending = LineCollection([], colors="red", animated=True)
+        for collection in (self.collection, self.pending):
+            cax.add_collection(collection, autolim=False)
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"Unknown L* indicator {mode!r}, expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.collection.set_linewidth(_LINE_WIDTHS[mode])
+        self.pending.set_linewidth(_LINE_WIDTHS[mode])
+        self._update()
+
+    def set_counts(self, counts):
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self._update()
+
+    def set_values(self, L_values):
+        self.set_counts(L_level_counts(L_values))
+
+    def add(self, L_values):
+        self.counts = self.counts + L_level_counts(L_values)
+        self._update()
+
+    def blit_artists(self, L_new):
+        # Artists to draw over the cached canvas after add(L_new). New markers go on top of the
+        # old ones; a distribution changes shape, so it is drawn again over a fresh color ramp
+        if self.mode == "markers":
+            self.pending.set_segments(self._markers(np.unique(L_level_index(L_new))))
+            return [self.pending]
+        return [self.collection] if self.backdrop is None else [self.backdrop, self.collection]
+
+    def clear_pending(self):
+        self.pending.set_segments([])
+
+    def _update(self):
+        if self.mode == "markers":
+            segments = self._markers(np.flatnonzero(self.counts))
+        elif self.mode == "histogram":
+            segments = self._histogram()
+        else:
+            segments = self._density()
+        self.collection.set_segments(segments)
+
+    @staticmethod
+    def _markers(levels):
+        # One horizontal segment across the bar per occupied level, as a (levels, 2, 2) array
+        y = levels * L_MARKER_RESOLUTION
+        segments = np.zeros((len(levels), 2, 2))
+        segments[:, 1, 0] = 1.0
+        segments[:, :, 1] = y[:, None]
+        return segments
+
+    def _histogram(self):
+        # Step outline of the binned counts, one polyline
+        per_bin = int(round(HISTOGRAM_BIN / L_MARKER_RESOLUTION))
+        bins = self.counts[:-1].reshape(-1, per_bin).sum(axis=1)
+        bins[-1] += self.counts[-1]
+        if not bins.any():
+            return []
+        widths = bins / bins.max()
+        edges = np.arange(len(bins) + 1) * HISTOGRAM_BIN
+        x = np.concatenate([[0.0], np.repeat(widths, 2), [0.0]])
+        y = np.repeat(edges, 2)
+        return [np.column_stack([x, y])]
+
+    def _density(self):
+        # Counts smoothed with a Gaussian kernel, one polyline
+        if not self.counts.any():
+            return []
+        radius = int(np.ceil(4 * DENSITY_SIGMA / L_MARKER_RESOLUTION))
+        offsets = np.arange(-radius, radius + 1) * L_MARKER_RESOLUTION
+        kernel = np.exp(-0.5 * (offsets / DENSITY_SIGMA) ** 2)
+        smooth = np.convolve(self.counts, kernel, mode="same")
+        return [np.column_stack([smooth / smooth.max(), np.arange(L_LEVELS) * L_MARKER_RESOLUTION])]
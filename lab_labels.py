@@ -0,0 +1,196 @@
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.artist import Artist
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from matplotlib.text import Text
+from matplotlib.transforms import ScaledTranslation
+
+
+# Labels sit this many points above their marker
+LABEL_OFFSET = 5
+
+# Declutter grid: a cell is one em wide and a line high. A shown label takes every cell its box
+# touches, and a label whose box touches a taken cell is left out, so shown labels never overlap
+LINE_HEIGHT = 1.3
+
+# Space kept clear around each label box, in points
+LABEL_PADDING = 1.0
+
+
+class LabelLayer(Artist):
+    # Text labels for chart points, drawn as one artist. At every draw only the points inside the
+    # current view are considered, and a screen-space grid keeps the labels whose boxes do not
+    # overlap one already placed, so draw time follows the labels that fit on screen rather than
+    # the number of points. The layout is reused until the view, the canvas size or the labels
+    # change; after a pan or zoom labels that stay on screen keep their Text artists and only
+    # the rest are laid out
+
+    def __init__(self, ax, offset=LABEL_OFFSET, fontsize=None):
+        super().__init__()
+        self.ax = ax
+        self.fontsize = fontsize if fontsize is not None else rcParams["font.size"]
+        self.offset = offset
+        self.set_figure(ax.figure)
+        self.set_zorder(3)
+        self._transform = ax.transData + ScaledTranslation(0, offset / 72.0, ax.figure.dpi_scale_trans)
+
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.texts = []
+        # Width of each label in points, from the advances of its characters
+        self.widths = np.empty(0)
+        self._order = np.empty(0, dtype=np.intp)
+        self._advances = {}
+
+        # Layout: the view it was made for, the occupied grid cells and the shown label indices
+        self._key = None
+        self._cells = set()
+        self._shown = {}
+        self._free = []
+
+        ax.add_artist(self)
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def shown(self):
+        # Indices of the labels drawn by the last layout
+        return np.fromiter(self._shown, dtype=np.intp, count=len(self._shown))
+
+    def set_labels(self, x, y, texts, first=()):
+        # Replaces every label; labels at the indices in `first` win their grid cell over the rest
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.texts = list(texts)
+        first = np.asarray(first, dtype=np.intp)
+        rest = np.setdiff1d(np.arange(len(self.texts)), first, assume_unique=True)
+        self._order = np.concatenate([first, rest])
+        self.widths = self._text_widths(self.texts)
+        self._release(list(self._shown))
+        self._key = None
+        self.stale = True
+
+    def extend(self, x, y, texts):
+        # Appends labels. With a layout in place the new ones take free cells right away, and
+        # their Text artists are returned so the caller can blit them; otherwise returns []
+        start = len(self.texts)
+        self.x = np.concatenate([self.x, np.asarray(x, dtype=np.float64)])
+        self.y = np.concatenate([self.y, np.asarray(y, dtype=np.float64)])
+        self.texts.extend(texts)
+        self.widths = np.concatenate([self.widths, self._text_widths(texts)])
+        new = np.arange(start, len(self.texts))
+        self._order = np.concatenate([self._order, new])
+        self.stale = True
+        if self._key is None or self._key != self._view_key():
+            self._key = None
+            return []
+
+        return [self._show(i) for i in self._place(new)]
+
+    def _view_key(self):
+        return tuple(self.ax.viewLim.bounds), tuple(self.ax.bbox.bounds), self.figure.dpi
+
+    def _text_widths(self, texts):
+        # Sum of the glyph advances of each text, in points; measured once per character
+        advances = self._advances
+        missing = {char for text in texts for char in text} - advances.keys()
+        if missing:
+            font = get_font(findfont(FontProperties(size=self.fontsize)))
+            font.set_size(self.fontsize, 72)
+            for char in missing:
+                try:
+                    advances[char] = font.load_char(ord(char)).linearHoriAdvance / 65536.0
+                except (RuntimeError, ValueError):
+                    advances[char] = self.fontsize
+        return np.array([sum(advances[char] for char in text) for text in texts], dtype=np.float64)
+
+    def _cell_size(self):
+        scale = self.figure.dpi / 72.0
+        return max(self.fontsize * scale, 1.0), max(self.fontsize * LINE_HEIGHT * scale, 1.0)
+
+    def _cull(self, indices):
+        # The labels among `indices` whose point is in view, with their boxes in pixels as
+        # (x0, y0, x1, y1) rows: centered above the point, as the Text artists are drawn
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        x = self.x[indices]
+        y = self.y[indices]
+        inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        indices = indices[inside]
+        if len(indices) == 0:
+            return indices, np.empty((0, 4))
+
+        scale = self.figure.dpi / 72.0
+        pixels = self.ax.transData.transform(np.column_stack([x[inside], y[inside]]))
+        half = (self.widths[indices] / 2.0 + LABEL_PADDING) * scale
+        bottom = pixels[:, 1] + (self.offset - LABEL_PADDING) * scale
+        top = bottom + (self.fontsize * LINE_HEIGHT + 2.0 * LABEL_PADDING) * scale
+        return indices, np.column_stack([pixels[:, 0] - half, bottom, pixels[:, 0] + half, top])
+
+    def _place(self, indices):
+        # Shows, in priority order, the labels among `indices` whose boxes touch no taken cell,
+        # and takes their cells. Returns the indices placed
+        indices, boxes = self._cull(indices)
+        width, height = self._cell_size()
+        cells = np.floor(boxes / [width, height, width, height]).astype(np.int64)
+
+        # Labels anchored in the same cell overlap whatever their width, so only the first of
+        # each is tried
+        anchors = (((cells[:, 0] + cells[:, 2]) // 2) << 32) + cells[:, 1]
+        _, first = np.unique(anchors, return_index=True)
+        first = np.sort(first)
+
+        placed = []
+        taken = self._cells
+        for i, (c0, r0, c1, r1) in zip(indices[first].tolist(), cells[first].tolist()):
+            box = [(column << 32) + row for column in range(c0, c1 + 1) for row in range(r0, r1 + 1)]
+            if taken.isdisjoint(box):
+                taken.update(box)
+                placed.append(i)
+        return placed
+
+    def _layout(self):
+        self._cells = set()
+        shown = self._place(self._order)
+
+        keep = set(shown)
+        self._release([i for i in self._shown if i not in keep])
+        for i in shown:
+            if i not in self._shown:
+                self._show(i)
+        self._key = self._view_key()
+
+    def _show(self, i):
+        text = self._free.pop() if self._free else self._new_text()
+        text.set_position((self.x[i], self.y[i]))
+        text.set_text(self.texts[i])
+        self._shown[i] = text
+        return text
+
+    def _release(self, indices):
+        for i in indices:
+            self._free.append(self._shown.pop(i))
+
+    def _new_text(self):
+        text = Text(ha="center", va="bottom", fontsize=self.fontsize)
+        text.set_figure(self.figure)
+        text.set_transform(self._transform)
+        return text
+
+    def draw_within(self, bbox, renderer):
+        # Draws the labels of the current layout that overlap `bbox` (display coordinates), for
+        # a caller blitting part of the axes
+        for text in self._shown.values():
+            if text.get_window_extent(renderer).overlaps(bbox):
+                text.draw(renderer)
+
+    def draw(self, renderer):
+        if not self.get_visible() or not self.texts:
+            self.stale = False
+            return
+        if self._key != self._view_key():
+            self._layout()
+        for text in self._shown.values():
+            text.draw(renderer)
+        self.stale = False
@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path
+
+from delta_e import delta_e_to_target
+from lab_convert import D65_WHITE, in_srgb_gamut, lab_to_srgb
+
+
+# Outline vertices: one per direction from the region's center
+OUTLINE_ANGLES = 180
+
+# Halvings of the search interval along each direction; 24 puts the edge within 1e-5 of a*b*
+BISECTION_STEPS = 24
+
+# No sRGB color has a chroma above this at any L*
+MAX_CHROMA = 200.0
+
+# Outlines are cached per L* rounded to this, so a slider does not fill the cache with near copies
+L_QUANTUM = 0.1
+
+# Outlines kept in memory, most recently used last
+PATH_CACHE_SIZE = 64
+
+# Gamuts with an outline. A CMYK outline needs the press's ICC profile and a color management
+# module to evaluate it, and the project ships neither, so only sRGB is offered
+GAMUTS = ("srgb",)
+
+_path_cache = OrderedDict()
+_path_lock = threading.Lock()
+
+
+def _cached(key, build):
+    with _path_lock:
+        if key in _path_cache:
+            _path_cache.move_to_end(key)
+            return _path_cache[key]
+
+    path = build()
+    with _path_lock:
+        _path_cache[key] = path
+        if len(_path_cache) > PATH_CACHE_SIZE:
+            _path_cache.popitem(last=False)
+    return path
+
+
+def clear_path_cache():
+    with _path_lock:
+        _path_cache.clear()
+
+
+def _quantize_L(L):
+    return min(max(round(float(L) / L_QUANTUM) * L_QUANTUM, 0.0), 100.0)
+
+
+def _outline(inside, center, start):
+    # Edge of a region around `center` that every ray from it crosses once: the last inside
+    # radius along each direction, found by bisection for all directions at once. `inside`
+    # takes (a, b) arrays; `start` is a radius to begin the search from
+    angles = np.linspace(0.0, 2.0 * np.pi, OUTLINE_ANGLES, endpoint=False)
+    cos, sin = np.cos(angles), np.sin(angles)
+    a0, b0 = center
+
+    low = np.zeros(OUTLINE_ANGLES)
+    high = np.full(OUTLINE_ANGLES, float(start))
+    # Widened until every direction is outside; chroma weighting makes ΔE94 and ΔE2000 regions
+    # much longer than the tolerance in saturated directions
+    for _ in range(16):
+        still = inside(a0 + high * cos, b0 + high * sin)
+        if not still.any():
+            break
+        low = np.where(still, high, low)
+        high = np.where(still, high * 2.0, high)
+
+    for _ in range(BISECTION_STEPS):
+        middle = (low + high) / 2.0
+        still = inside(a0 + middle * cos, b0 + middle * sin)
+        low = np.where(still, middle, low)
+        high = np.where(still, high, middle)
+
+    vertices = np.column_stack([a0 + low * cos, b0 + low * sin])
+    return Path(np.vstack([vertices, vertices[:1]]), closed=True)
+
+
+def tolerance_path(target, tolerance, method="2000", L=None):
+    # a*b* outline of the colors within `tolerance` ΔE of target (L*, a*, b*), cut at L (the
+    # target's own L* by default). None where the cut misses the region
+    target = tuple(float(value) for value in target)
+    L = target[0] if L is None else _quantize_L(L)
+    key = ("tolerance", target, float(tolerance), str(method), L)
+
+    def build():
+        def inside(a, b):
+            return delta_e_to_target(np.full_like(a, L), a, b, target, method) <= tolerance
+
+        if not inside(np.array([target[1]]), np.array([target[2]]))[0]:
+            return None
+        return _outline(inside, target[1:], max(float(tolerance), 1.0))
+
+    return _cached(key, build)
+
+
+def gamut_path(L, gamut="srgb", white=D65_WHITE):
+    # a*b* outline of the colors sRGB can show at L*; None at black and white, where it is a point
+    if gamut not in GAMUTS:
+        raise ValueError(f"Unknown gamut {gamut!r}, expected one of {', '.join(GAMUTS)}")
+    L = _quantize_L(L)
+    white = tuple(float(value) for value in white)
+    key = (gamut, L, white)
+
+    def build():
+        if L <= 0.0 or L >= 100.0:
+            return None
+
+        def inside(a, b):
+            lab = np.column_stack([np.full_like(a, L), a, b])
+            return in_srgb_gamut(lab_to_srgb(lab, np.array(white)))
+
+        return _outline(inside, (0.0, 0.0), MAX_CHROMA)
+
+    return _cached(key, build)
+
+
+def within_tolerance(L_values, a_values, b_values, target, tolerance, method="2000"):
+    # Exact per point, each at its own L*; the outline is only the cut at one L*
+    return delta_e_to_target(L_values, a_values, b_values, target, method) <= tolerance
+
+
+def in_gamut(L_values, a_values, b_values, white=D65_WHITE):
+    lab = np.column_stack([L_values, a_values, b_values])
+    return in_srgb_gamut(lab_to_srgb(lab, white))
+
+
+def inside_path(path, a_values, b_values):
+    # Points of one L* plane inside an outline (or any acceptance region drawn as a Path)
+    if path is None:
+        return np.zeros(len(a_values), dtype=bool)
+    return path.contains_points(np.column_stack([a_values, b_values]))
+
+
+class Overlays:
+    # Tolerance regions and the gamut outline of a chart, each kind drawn as one collection whose
+    # paths come from the outline cache: changing L* or the tolerance swaps paths in place, and
+    # a batch run reuses the outlines of earlier charts
+
+    def __init__(self, ax):
+        self.ax = ax
+        # L* of the cut; tolerance regions default to their target's L*, the gamut to 50
+        self.L = None
+        self.targets = []
+        self.tolerance = None
+        self.method = "2000"
+        self.gamut = None
+        self.white = D65_WHITE
+
+        self.tolerance_regions = PathCollection(
+            [], facecolors="none", edgecolors="red", linestyles="--", linewidths=1.2, zorder=2.5
+        )
+        self.gamut_outline = PathCollection([], facecolors="none", edgecolors="black", linewidths=1.0, zorder=2.4)
+        for collection in (self.tolerance_regions, self.gamut_outline):
+            collection.set_transform(ax.transData)
+            ax.add_collection(collection, autolim=False)
+
+    def set_L(self, L):
+        self.L = None if L is None else float(L)
+        self._update()
+
+    def set_tolerance(self, targets, tolerance, method="2000"):
+        # Regions within `tolerance` ΔE of each (L*, a*, b*) target; None tolerance removes them
+        self.targets = [tuple(float(value) for value in target) for target in targets]
+        self.tolerance = None if tolerance is None else float(tolerance)
+        self.method = method
+        self._update()
+
+    def show_gamut(self, gamut="srgb", white=D65_WHITE):
+        # Outline of the gamut at the current L*; None hides it
+        if gamut is not None and gamut not in GAMUTS:
+            raise ValueError(f"Unknown gamut {gamut!r}, expected one of {', '.join(GAMUTS)}")
+        self.gamut = gamut
+        self.white = white
+        self._update()
+
+    def _update(self):
+        paths = []
+        if self.tolerance is not None:
+            for target in self.targets:
+                path = tolerance_path(target, self.tolerance, self.method, self.L)
+                if path is not None:
+                    paths.append(path)
+        self.tolerance_regions.set_paths(paths)
+
+        path = None if self.gamut is None else gamut_path(50.0 if self.L is None else self.L, self.gamut, self.white)
+        self.gamut_outline.set_paths([] if path is None else [path])
+
+    def classify(self, L_values, a_values, b_values):
+        # Per point: "in_gamut", and with a tolerance "passed" (within it of any target) and
+        # "nearest_target", all computed over whole arrays
+        result = {"in_gamut": in_gamut(L_values, a_values, b_values, self.white)}
+        if self.tolerance is not None and self.targets:
+            distances = np.stack(
+                [delta_e_to_target(L_values, a_values, b_values, target, self.method) for target in self.targets]
+            )
+            result["nearest_target"] = distances.argmin(axis=0)
+            result["passed"] = distances.min(axis=0) <= self.tolerance
+        return result
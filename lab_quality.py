@@ -0,0 +1,69 @@
+import math
+import re
+
+
+# Figure size of the rendered charts, in inches
+FIGSIZE = (6.4, 4.8)
+
+# Share of the figure the square a*b* axes can take (Matplotlib's default subplot margins)
+AXES_BOX = (0.775, 0.77)
+
+# Background grid sizes chosen by adaptive quality are multiples of GRID_STEP in this range
+MIN_GRID = 64
+MAX_GRID = 2048
+GRID_STEP = 64
+
+
+class Quality:
+    # How finely a chart is rendered: pixels per side of the background slice, L* spacing of the
+    # slices, the output DPI and whether points get text labels
+
+    def __init__(self, name, size, step, dpi, labels=True):
+        self.name = name
+        self.size = int(size)
+        self.step = float(step)
+        self.dpi = float(dpi)
+        self.labels = labels
+
+    def __repr__(self):
+        return f"Quality({self.name!r}, size={self.size}, step={self.step:g}, dpi={self.dpi:g}, labels={self.labels})"
+
+    def backgrounds(self):
+        # Lookup with nearest(L); print-sized slices are rendered once per L* and cached on disk
+        from lab_gamut import backgrounds
+
+        return backgrounds(self.size, self.step)
+
+    def pixels(self, figsize=FIGSIZE):
+        return round(figsize[0] * self.dpi), round(figsize[1] * self.dpi)
+
+
+PRESETS = {
+    # Thumbnails and previews: a quarter of the screen pixels, a coarse background and no labels,
+    # which would be unreadable at that size anyway
+    "draft": Quality("draft", 64, 2.0, 50, labels=False),
+    "screen": Quality("screen", 256, 1.0, 100),
+    "print": Quality("print", 1024, 1.0, 300),
+}
+
+
+def adaptive_quality(width, height, figsize=FIGSIZE):
+    # Quality for a canvas of width x height pixels: the DPI that fits the figure into it and a
+    # background with about one grid cell per screen pixel of the a*b* axes
+    dpi = min(width / figsize[0], height / figsize[1])
+    axes_pixels = min(AXES_BOX[0] * figsize[0], AXES_BOX[1] * figsize[1]) * dpi
+    size = min(max(int(math.ceil(axes_pixels / GRID_STEP)) * GRID_STEP, MIN_GRID), MAX_GRID)
+    step = 2.0 if size <= MIN_GRID else 1.0
+    return Quality(f"{int(width)}x{int(height)}", size, step, dpi, labels=dpi > PRESETS["draft"].dpi)
+
+
+def get_quality(spec="screen"):
+    # A preset name, a canvas size such as "1920x1080", or a Quality
+    if isinstance(spec, Quality):
+        return spec
+    if spec in PRESETS:
+        return PRESETS[spec]
+    match = re.fullmatch(r"(\d+)[xX](\d+)", str(spec))
+    if match is None:
+        raise ValueError(f"Unknown quality {spec!r}, expected one of {', '.join(PRESETS)} or WIDTHxHEIGHT")
+    return adaptive_quality(int(match.group(1)), int(match.group(2)))
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+
+# Per-worker state, set up once by _init_worker
+_renderer = None
+_shm = None
+
+
+def _attach_slices(shm_name, shape, dtype, step):
+    global _shm
+    from lab_gamut import LabSlices
+
+    import numpy as np
+
+    # Workers share the parent's resource tracker, so only the parent unlinks the segment
+    _shm = shared_memory.SharedMemory(name=shm_name)
+
+    slices = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+    slices.flags.writeable = False
+    return LabSlices(slices, step)
+
+
+def _init_worker(
+    shm_name,
+    shape,
+    dtype,
+    step,
+    out_dir,
+    formats,
+    dpi,
+    target,
+    method,
+    swatches,
+    quality,
+    tolerance,
+    gamut,
+    L_indicator,
+    data,
+):
+    global _renderer
+
+    # Workers never open windows
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    from lab_batch import BatchRenderer
+
+    # Warm template: the figure and the shared backgrounds are reused for every job. Print-sized
+    # slices are not shared as a table; each worker loads them from the disk cache as needed
+    slices = _attach_slices(shm_name, shape, dtype, step) if shm_name is not None else None
+    _renderer = BatchRenderer(
+        out_dir,
+        formats,
+        dpi,
+        slices=slices,
+        target=target,
+        method=method,
+        swatches=swatches,
+        quality=quality,
+        tolerance=tolerance,
+        gamut=gamut,
+        L_indicator=L_indicator,
+        data=data,
+    )
+
+
+def _render_job(job):
+    name, L_values, a_values, b_values = job
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    paths = _renderer.render(name, L_values, a_values, b_values)
+    return name, paths, time.perf_counter() - start, time.process_time() - cpu_start, os.getpid()
+
+
+class FarmSummary:
+    def __init__(self, workers):
+        self.workers = workers
+        self.charts = 0
+        self.wall = 0.0
+        self.render_time = 0.0
+        self.cpu_time = 0.0
+        self.per_worker = {}
+
+    def add(self, seconds, cpu_seconds, pid):
+        self.charts += 1
+        self.render_time += seconds
+        self.cpu_time += cpu_seconds
+        self.per_worker[pid] = self.per_worker.get(pid, 0) + 1
+
+    def __str__(self):
+        if not self.charts:
+            return "No charts rendered"
+        # CPU seconds spent rendering per wall-clock second: how many cores were kept busy. It is not
+        # a speedup, which would need a serial run of the same jobs to compare against
+        parallelism = self.cpu_time / self.wall if self.wall > 0 else 0.0
+        return (
+            f"Rendered {self.charts} charts in {self.wall:.2f} s with {self.workers} workers "
+            f"({self.charts / self.wall:.1f} charts/s, mean {1000 * self.render_time / self.charts:.1f} ms/chart, "
+            f"parallelism {parallelism:.2f}, utilization {100 * parallelism / self.workers:.0f}%, "
+            f"charts per worker {sorted(self.per_worker.values(), reverse=True)})"
+        )
+
+
+def render_farm(
+    jobs,
+    out_dir,
+    formats=("png",),
+    dpi=None,
+    workers=None,
+    progress=sys.stderr,
+    target=None,
+    method="2000",
+    swatches=None,
+    quality="screen",
+    tolerance=None,
+    gamut=None,
+    L_indicator="markers",
+    data=None,
+):
+    # Renders (name, L, a, b) jobs in a process pool and returns a FarmSummary
+    import numpy as np
+    from lab_gamut import LabSlices
+    from lab_quality import get_quality
+
+    workers = workers or os.cpu_count() or 1
+    summary = FarmSummary(workers)
+    start = time.perf_counter()
+    quality = get_quality(quality)
+
+    # One copy of the background slices in shared memory for every worker
+    slices = quality.backgrounds()
+    shm = None
+    if isinstance(slices, LabSlices):
+        shm = shared_memory.SharedMemory(create=True, size=slices.slices.nbytes)
+    try:
+        if shm is not None:
+            shared = np.ndarray(slices.slices.shape, dtype=slices.slices.dtype, buffer=shm.buf)
+            shared[...] = slices.slices
+            del shared
+            initargs = (shm.name, slices.slices.shape, slices.slices.dtype.str, slices.step)
+        else:
+            initargs = (None, None, None, None)
+        initargs += (out_dir, formats, dpi, target, method, swatches, quality, tolerance, gamut, L_indicator, data)
+
+        # spawn avoids inheriting GUI or pyplot state from the parent
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=initargs) as pool:
+            futures = [pool.submit(_render_job, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                name, paths, seconds, cpu_seconds, pid = future.result()
+                summary.add(seconds, cpu_seconds, pid)
+                if progress is not None:
+                    print(f"[{done}/{len(futures)}] {name} {1000 * seconds:.0f} ms", file=progress)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    summary.wall = time.perf_counter() - start
+    if progress is not None:
+        print(summary, file=progress)
+    return summary
@@ -0,0 +1,178 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+from point_store import COLUMNS, METADATA, PointStore
+
+
+# Bump when the file layout changes; older sessions are then refused instead of misread
+SESSION_VERSION = 1
+SESSION_DIR = os.environ.get(
+    "LABCOLORCHART_SESSION", os.path.join(os.path.expanduser("~"), ".local", "share", "labcolorchart", "session")
+)
+
+META_FILE = "session.json"
+LOCK_FILE = "session.lock"
+
+
+def _lock(f):
+    # Keeps a second app instance from interleaving its appends with ours
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        raise RuntimeError(f"The session in {os.path.dirname(f.name)} is open in another instance") from None
+
+
+class Session:
+    # The points of an app session on disk. Every column is a raw, append-only binary file:
+    # reopening memory-maps them (no parsing, near-instant at any size) and each append writes
+    # just the new rows. session.json holds the dtypes and batch names. With directory=None
+    # the session lives in memory only
+
+    def __init__(self, directory=SESSION_DIR):
+        self.directory = directory
+        self._files = {}
+        self._lock_file = None
+        if directory is None:
+            self.points = PointStore(metadata=True)
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, LOCK_FILE), "a+b")
+        try:
+            _lock(self._lock_file)
+            self.points = self._map()
+            self._files = {name: open(self._path(name), "ab") for name in COLUMNS + METADATA}
+        except Exception:
+            self.close()
+            raise
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.directory, META_FILE)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        if meta.get("version") != SESSION_VERSION:
+            raise ValueError(
+                f"{self.directory} holds a session of version {meta.get('version')}, expected {SESSION_VERSION}"
+            )
+        return meta
+
+    def _write_meta(self):
+        # Small and rarely rewritten (new batch names only), so replaced whole and atomically
+        meta = {
+            "version": SESSION_VERSION,
+            "columns": {name: self.points.column(name).dtype.str for name in COLUMNS + METADATA},
+            "batches": self.points.batches,
+        }
+        path = os.path.join(self.directory, META_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _map(self):
+        meta = self._read_meta()
+        if meta is None:
+            store = PointStore(metadata=True)
+            self.points = store
+            for name in COLUMNS + METADATA:
+                open(self._path(name), "wb").close()
+            self._write_meta()
+            return store
+
+        dtypes = {name: np.dtype(dtype) for name, dtype in meta["columns"].items()}
+        sizes = {name: os.path.getsize(self._path(name)) if os.path.exists(self._path(name)) else 0 for name in dtypes}
+
+        # A crash between two column writes leaves some columns one row ahead; those rows are dropped
+        rows = min(sizes[name] // dtypes[name].itemsize for name in dtypes)
+        columns = {}
+        for name, dtype in dtypes.items():
+            if sizes[name] != rows * dtype.itemsize:
+                os.truncate(self._path(name), rows * dtype.itemsize)
+            if rows:
+                columns[name] = np.memmap(self._path(name), dtype=dtype, mode="r", shape=(rows,))
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+        return PointStore.from_columns(columns, meta["batches"])
+
+    def __len__(self):
+        return len(self.points)
+
+    def _write_rows(self, start, batches):
+        if self.directory is None:
+            return
+        if len(self.points.batches) != batches:
+            self._write_meta()
+        for name, f in self._files.items():
+            f.write(self.points.column(name)[start:].tobytes())
+            f.flush()
+
+    def append(self, L, a, b, sample_id=None, timestamp=None, batch=None):
+        self.extend([L], [a], [b], sample_id, timestamp, batch)
+
+    def extend(self, L_values, a_values, b_values, sample_id=None, timestamp=None, batch=None):
+        # Same arguments as PointStore.extend; only the new rows reach the disk
+        start = len(self.points)
+        batches = len(self.points.batches)
+        self.points.extend(L_values, a_values, b_values, sample_id, timestamp, batch)
+        self._write_rows(start, batches)
+
+    def clear(self):
+        # Starts over in new, empty files instead of truncating the old ones: a reopened session's
+        # columns are memory maps, and the chart may still hold views of them that would fault
+        # (SIGBUS) on their next read. The old files are freed once their last map is gone
+        self.points.clear()
+        if self.directory is None:
+            return
+        for name, f in self._files.items():
+            f.close()
+            path = self._path(name)
+            open(path + ".tmp", "wb").close()
+            os.replace(path + ".tmp", path)
+            self._files[name] = open(path, "ab")
+        self._write_meta()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or export a saved session.")
+    parser.add_argument("directory", nargs="?", default=SESSION_DIR)
+    parser.add_argument("--export", metavar="DIR", help="Copy the points to .npy files (PointStore.save)")
+    args = parser.parse_args(argv)
+
+    session = Session(args.directory)
+    points = session.points
+    print(f"{args.directory}: {len(points)} points in {len(points.batches)} batches")
+    if len(points):
+        last = (float(points.L[-1]), float(points.a[-1]), float(points.b[-1]))
+        print(f"L* {points.L.min():.2f}..{points.L.max():.2f}, last point {last}")
+    if args.export:
+        points.save(args.export)
+    session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import os
+import threading
+import time
+
+
+# Set by benchmarks/startup.py to time the first window and the first chart
+STARTUP_BENCH = bool(os.environ.get("LABCOLORCHART_STARTUP_BENCH"))
+
+# Sample point entered automatically in benchmark mode
+BENCH_POINT = ("50", "20", "-20")
+
+
+def report_startup(stage):
+    if STARTUP_BENCH:
+        print(f"STARTUP {stage} {time.time():.6f}", flush=True)
+
+
+def _preload():
+    try:
+        # NumPy, Matplotlib and the background slices, in the order the first chart needs them
+        import lab_chart  # noqa: F401
+        from lab_gamut import lab_slices
+
+        lab_slices()
+    except Exception:
+        # The first chart request imports the same modules again and reports the error there
+        pass
+
+
+def preload_in_background():
+    # Loads the plotting stack while the input window is already usable
+    thread = threading.Thread(target=_preload, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,341 @@
+import math
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+
+# Readings kept on the chart; older ones drop out of the window
+DEFAULT_WINDOW = 2000
+
+# Chart refreshes per second; readings arriving between frames are drawn together
+DEFAULT_FPS = 10
+
+# How often blocking sources wake up to check whether they should stop, in seconds
+STOP_CHECK = 0.5
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def parse_reading(line):
+    # First three numbers on a line, e.g. "52.1,10.3,-4.0" or "L=52.1 a=10.3 b=-4.0"; with ";" or
+    # tab separators commas are decimal commas. Returns None for lines without three finite numbers
+    if isinstance(line, bytes):
+        line = line.decode("ascii", "ignore")
+    if ";" in line or "\t" in line:
+        line = line.replace(",", ".")
+    numbers = _NUMBER.findall(line)
+    if len(numbers) < 3:
+        return None
+    reading = tuple(float(number) for number in numbers[:3])
+    # Exponents out of range, such as 1e999, overflow to infinity
+    if not all(math.isfinite(value) for value in reading):
+        return None
+    return reading
+
+
+class RingBuffer:
+    # The latest `capacity` readings in one preallocated array; memory stays the same however
+    # long the run. Sources append from their reader threads, the chart reads from the UI thread
+
+    def __init__(self, capacity=DEFAULT_WINDOW):
+        if capacity < 1:
+            raise ValueError("The window must hold at least one reading")
+        self.capacity = int(capacity)
+        self.total = 0
+        self._data = np.empty((self.capacity, 3))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, L, a, b):
+        with self._lock:
+            self._data[self.total % self.capacity] = (L, a, b)
+            self.total += 1
+
+    def extend(self, lab):
+        lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+        with self._lock:
+            skipped = max(len(lab) - self.capacity, 0)
+            slots = (self.total + skipped + np.arange(len(lab) - skipped)) % self.capacity
+            self._data[slots] = lab[skipped:]
+            self.total += len(lab)
+
+    def clear(self):
+        with self._lock:
+            self.total = 0
+
+    def snapshot(self):
+        # Copies of the window, oldest first, and the running total they correspond to
+        with self._lock:
+            if self.total <= self.capacity:
+                window = self._data[: self.total].copy()
+            else:
+                start = self.total % self.capacity
+                window = np.concatenate([self._data[start:], self._data[:start]])
+            total = self.total
+        return window[:, 0], window[:, 1], window[:, 2], total
+
+
+def iter_tail_lines(path, stop, poll_interval=0.2, from_start=False):
+    # Follows a growing file like `tail -f`; starts over if the file is truncated or replaced
+    f = open(path, "rb")
+    try:
+        if not from_start:
+            f.seek(0, 2)
+        partial = b""
+        while not stop.is_set():
+            chunk = f.readline()
+            if chunk:
+                partial += chunk
+                if partial.endswith(b"\n"):
+                    yield partial
+                    partial = b""
+                continue
+
+            # At the end of the file: if `path` now names another file (log rotation) or has
+            # shrunk (truncation), it is read again from its start
+            try:
+                current = os.stat(path)
+                opened = os.fstat(f.fileno())
+                replaced = (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev)
+                if replaced or current.st_size < f.tell():
+                    reopened = open(path, "rb")
+                    f.close()
+                    f = reopened
+                    partial = b""
+            except OSError:
+                # Moved away and not recreated yet: the old file is followed meanwhile
+                pass
+            stop.wait(poll_interval)
+    finally:
+        f.close()
+
+
+def iter_tcp_lines(host, port, stop):
+    # One reading per line from a TCP server, e.g. an instrument behind a serial-to-Ethernet bridge
+    with socket.create_connection((host, port), timeout=10) as connection:
+        connection.settimeout(STOP_CHECK)
+        partial = b""
+        while not stop.is_set():
+            try:
+                data = connection.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            lines = (partial + data).split(b"\n")
+            partial = lines.pop()
+            yield from lines
+
+
+def iter_serial_lines(port, stop, baudrate=9600):
+    # pyserial is optional; only serial sources need it
+    try:
+        import serial
+    except ImportError:
+        raise ImportError("Reading from a serial port needs pyserial (pip install pyserial)") from None
+
+    with serial.Serial(port, baudrate=baudrate, timeout=STOP_CHECK) as device:
+        while not stop.is_set():
+            line = device.readline()
+            if line:
+                yield line
+
+
+def iter_simulated_lines(stop, interval=0.3, burst=5, seed=0):
+    # Stand-in for a colorimeter: readings drift slowly around a target color, every `interval`
+    # seconds, with an occasional burst of `burst` readings at once
+    rng = np.random.default_rng(seed)
+    center = np.array([55.0, 12.0, -8.0])
+    while not stop.is_set():
+        count = burst if rng.random() < 0.1 else 1
+        for _ in range(count):
+            center += rng.normal(0.0, [0.05, 0.2, 0.2])
+            L, a, b = center + rng.normal(0.0, [0.5, 1.5, 1.5])
+            yield f"{L:.2f},{a:.2f},{b:.2f}\n"
+        stop.wait(interval)
+
+
+def open_source(spec, stop):
+    # Line iterator for a source description:
+    #   simulate[:interval]              simulated readings
+    #   tcp://host:port                  TCP stream
+    #   serial://PORT[?baud=9600]        serial port, e.g. serial://COM3 or serial:///dev/ttyUSB0
+    #   tail://path or a plain path      a file another program appends to
+    if spec == "simulate" or spec.startswith("simulate:"):
+        interval = float(spec.partition(":")[2] or 0.3)
+        return iter_simulated_lines(stop, interval)
+
+    url = urlsplit(spec)
+    if url.scheme == "tcp":
+        if not url.hostname or not url.port:
+            raise ValueError(f"Expected tcp://host:port, got {spec!r}")
+        return iter_tcp_lines(url.hostname, url.port, stop)
+    if url.scheme == "serial":
+        baudrate = int(parse_qs(url.query).get("baud", ["9600"])[0])
+        return iter_serial_lines(url.netloc + url.path, stop, baudrate)
+    if url.scheme == "tail":
+        return iter_tail_lines(url.netloc + url.path, stop)
+    return iter_tail_lines(spec, stop)
+
+
+class StreamReader:
+    # Background thread moving readings from a source into a RingBuffer
+
+    def __init__(self, spec, buffer):
+        self.spec = spec
+        self.buffer = buffer
+        self.readings = 0
+        self.skipped = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._lines = open_source(spec, self._stop)
+        self._thread = threading.Thread(target=self._run, name="stream", daemon=True)
+
+    def _run(self):
+        try:
+            for line in self._lines:
+                reading = parse_reading(line)
+                if reading is None:
+                    self.skipped += 1
+                    continue
+                self.buffer.append(*reading)
+                self.readings += 1
+        except Exception as e:
+            # Kept for the UI to report; the thread just ends
+            self.error = e
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2 * STOP_CHECK):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+
+class StreamView:
+    # Keeps a chart in step with a RingBuffer. refresh() may be called as often as the event loop
+    # likes: it draws at most `fps` times a second and only when readings arrived, so a burst
+    # of readings between two frames costs one update
+
+    def __init__(self, buffer, fps=DEFAULT_FPS):
+        self.buffer = buffer
+        self.interval = 1.0 / fps
+        self.frames = 0
+        self._shown = 0
+        self._last = 0.0
+
+    @property
+    def interval_ms(self):
+        return max(1, int(round(self.interval * 1000)))
+
+    def refresh(self, chart, force=False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return False
+        if self.buffer.total == self._shown:
+            return False
+
+        L, a, b, total = self.buffer.snapshot()
+        self._last = now
+        self.frames += 1
+        if self._shown <= total <= self.buffer.capacity and chart.count == self._shown:
+            # The window is still filling: only the new readings are added
+            chart.add_points(L[self._shown :], a[self._shown :], b[self._shown :])
+        else:
+            # Readings dropped out of the window, so the chart is rebuilt from it
+            chart.set_points(L, a, b)
+        self._shown = total
+        return True
+
+
+def serve_simulated(port, interval=0.3):
+    # Local TCP stand-in for an instrument, one simulated feed per client
+    server = socket.create_server(("127.0.0.1", port))
+    print(f"Serving simulated readings on tcp://127.0.0.1:{port}", file=sys.stderr)
+
+    def feed(connection):
+        stop = threading.Event()
+        with connection:
+            try:
+                for line in iter_simulated_lines(stop, interval):
+                    connection.sendall(line.encode("ascii"))
+            except OSError:
+                stop.set()
+
+    with server:
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(target=feed, args=(connection,), daemon=True).start()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Live chart of a stream of L*a*b* readings.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    view = commands.add_parser("view", help="Chart a source live")
+    view.add_argument("source", help="simulate, tcp://host:port, serial://PORT?baud=9600 or a file to follow")
+    view.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Readings kept on the chart")
+    view.add_argument("--fps", type=float, default=DEFAULT_FPS)
+
+    simulate = commands.add_parser("simulate", help="Emit simulated readings to stdout or a TCP port")
+    simulate.add_argument("--interval", type=float, default=0.3)
+    simulate.add_argument("--tcp", type=int, metavar="PORT", help="Serve on this local port instead of stdout")
+
+    args = parser.parse_args(argv)
+    if args.command == "simulate":
+        if args.tcp:
+            serve_simulated(args.tcp, args.interval)
+            return 0
+        try:
+            for line in iter_simulated_lines(threading.Event(), args.interval):
+                sys.stdout.write(line)
+                sys.stdout.flush()
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        return 0
+
+    import matplotlib.pyplot as plt
+    from lab_chart import LabChart
+    from lab_gamut import lab_slices
+
+    buffer = RingBuffer(args.window)
+    reader = StreamReader(args.source, buffer).start()
+    stream = StreamView(buffer, args.fps)
+    chart = LabChart(lab_slices().nearest(50))
+
+    def tick():
+        if stream.refresh(chart):
+            L = chart.L_values
+            chart.set_background(lab_slices().nearest(L[-1]))
+        if reader.error is not None:
+            timer.stop()
+            print(f"{args.source}: {reader.error}", file=sys.stderr)
+
+    timer = chart.fig.canvas.new_timer(interval=stream.interval_ms)
+    timer.add_callback(tick)
+    timer.start()
+    plt.show()
+
+    reader.stop()
+    print(f"{reader.readings} readings, {reader.skipped} unreadable lines, {stream.frames} frames", file=sys.stderr)
+    return 1 if reader.error is not None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
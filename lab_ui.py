@@ -0,0 +1,564 @@
+import math
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+# How often the Tk event loop picks up finished chart work, in milliseconds
+POLL_INTERVAL = 15
+
+# PySimpleGUI event that carries finished chart work back to the window loop
+WORKER_EVENT = "-CHART-WORKER-"
+
+# Files offered by the Import dialog
+IMPORT_FILE_TYPES = (("L*a*b* measurements", "*.csv *.txt *.tsv *.parquet *.pq"),)
+IMPORT_PROMPT = "Select a file of L*a*b* measurements"
+
+# Save dialog choices: the chart as an image, or its points with their metrics
+SAVE_FILE_TYPES = (
+    ("PNG image", "*.png"),
+    ("SVG image", "*.svg"),
+    ("PDF document", "*.pdf"),
+    ("Points as CSV", "*.csv"),
+    ("Points as Parquet", "*.parquet"),
+)
+SAVE_PROMPT = "Save the chart, or its points as CSV or Parquet"
+
+# Default source offered by the Stream button
+STREAM_SOURCE = "simulate"
+STREAM_PROMPT = "Source: simulate, tcp://host:port, serial://PORT?baud=9600 or a file to follow"
+
+INVALID_ENTRY = "Please enter valid values for L*a*b*."
+
+
+class ChartWorker:
+    # One background thread for the slow part of a chart update: gamut lookups, file imports,
+    # binning, outliers and delta E. Finished work is handed to `post(done, future)`, which must
+    # be safe to call from any thread; the UI thread then calls done(future) and touches the artists
+
+    def __init__(self, post):
+        self._post = post
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart")
+
+    def _finished(self, done, future):
+        if not self._closed and not future.cancelled():
+            self._post(done, future)
+
+    def submit(self, work, done, *args):
+        # Jobs run one at a time in submission order, so results come back in order too
+        future = self._executor.submit(work, *args)
+        future.add_done_callback(lambda future: self._finished(done, future))
+        return future
+
+    def shutdown(self):
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def tk_worker(root):
+    # Tk may only be used from the thread running mainloop, so results wait in a queue
+    # that the event loop drains every POLL_INTERVAL
+    results = queue.Queue()
+
+    def poll():
+        while True:
+            try:
+                done, future = results.get_nowait()
+            except queue.Empty:
+                break
+            done(future)
+        root.after(POLL_INTERVAL, poll)
+
+    root.after(POLL_INTERVAL, poll)
+    return ChartWorker(lambda done, future: results.put((done, future)))
+
+
+def sg_worker(window):
+    # write_event_value is PySimpleGUI's thread-safe way into window.read(); the loop
+    # answers WORKER_EVENT with `done, future = values[WORKER_EVENT]; done(future)`
+    return ChartWorker(lambda done, future: window.write_event_value(WORKER_EVENT, (done, future)))
+
+
+def embed_chart(master, background=None, figsize=(6.4, 4.8), toolbar=True):
+    # LabChart on a FigureCanvasTkAgg packed into `master` (a tk widget, or the TKCanvas of a
+    # PySimpleGUI Canvas element). The figure is not managed by pyplot, so nothing blocks in plt.show()
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    from matplotlib.figure import Figure
+
+    from lab_chart import LabChart
+
+    fig = Figure(figsize=figsize)
+    canvas = FigureCanvasTkAgg(fig, master=master)
+    chart = LabChart(background, fig=fig)
+
+    if toolbar:
+        NavigationToolbar2Tk(canvas, master, pack_toolbar=False).pack(side="bottom", fill="x")
+    canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+    canvas.draw_idle()
+    return chart
+
+
+def open_chart3d(root, lod="random"):
+    # LabChart3D in a window of its own next to the main one, drawn by a FigureCanvasTkAgg
+    import tkinter as tk
+
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    from matplotlib.figure import Figure
+
+    from lab_chart3d import LabChart3D
+
+    window = tk.Toplevel(root)
+    window.title("LAB Color Chart 3D")
+    fig = Figure(figsize=(6.4, 6.0))
+    canvas = FigureCanvasTkAgg(fig, master=window)
+    chart = LabChart3D(fig=fig, lod=lod)
+
+    def close():
+        chart.closed = True
+        window.destroy()
+
+    window.protocol("WM_DELETE_WINDOW", close)
+    NavigationToolbar2Tk(canvas, window, pack_toolbar=False).pack(side="bottom", fill="x")
+    canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+    canvas.draw_idle()
+    return chart
+
+
+def parse_lab(L, a, b):
+    # L*, a* and b* as typed; float() also accepts "nan" and "inf", which no chart can place
+    values = tuple(float(value) for value in (L, a, b))
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError("L*a*b* values must be finite numbers")
+    return values
+
+
+def load_session():
+    # Worker half of opening the app's session: imports the point store, and NumPy with it, and
+    # maps the saved columns. Startup benchmarks use the session directory they are given, or none
+    from lab_session import SESSION_DIR, Session
+    from lab_startup import STARTUP_BENCH
+
+    if STARTUP_BENCH and "LABCOLORCHART_SESSION" not in os.environ:
+        return Session(None)
+    return Session(SESSION_DIR)
+
+
+def nearest_background(L):
+    # Gamut slice for the chart background; the first call may load the slice cache from disk
+    from instrumentation import render
+    from lab_gamut import lab_slices
+
+    with render("nearest_background"):
+        return lab_slices().nearest(L)
+
+
+def chart_points(chart):
+    # The chart's arrays, taken on the UI thread; they are replaced rather than modified in
+    # place, so the worker can keep reading them while new points arrive
+    return chart.L_values, chart.a_values, chart.b_values
+
+
+def prepare_import(chart, path, points):
+    # Worker half of an import: parse the file and prepare the chart with the new points
+    # appended to `points` (from chart_points). Returns (L, a, b, stats, background, prepared)
+    import numpy as np
+
+    from lab_import import import_lab_file
+
+    L, a, b, stats = import_lab_file(path)
+    if len(L) == 0:
+        return L, a, b, stats, None, None
+
+    L_values, a_values, b_values = points
+    prepared = chart.prepare_points(
+        np.concatenate([L_values, L]), np.concatenate([a_values, a]), np.concatenate([b_values, b])
+    )
+    return L, a, b, stats, nearest_background(L[-1]), prepared
+
+
+class SgDialogs:
+    # Messages and file choosers of the PySimpleGUI apps, for ChartApp
+
+    def __init__(self):
+        import PySimpleGUI as sg
+
+        self.sg = sg
+
+    def error(self, message):
+        self.sg.popup_error(message)
+
+    def info(self, title, message):
+        self.sg.popup_ok(message, title=title)
+
+    def ask_import_file(self):
+        return self.sg.popup_get_file(IMPORT_PROMPT, file_types=IMPORT_FILE_TYPES)
+
+    def ask_save_file(self):
+        return self.sg.popup_get_file(SAVE_PROMPT, save_as=True, default_extension=".png", file_types=SAVE_FILE_TYPES)
+
+    def ask_stream_source(self):
+        return self.sg.popup_get_text(STREAM_PROMPT, default_text=STREAM_SOURCE)
+
+
+class TkDialogs:
+    # Messages and file choosers of the Tk app, for ChartApp
+
+    def __init__(self, root):
+        self.root = root
+
+    def error(self, message):
+        from tkinter import messagebox
+
+        messagebox.showerror("Error", message, parent=self.root)
+
+    def info(self, title, message):
+        from tkinter import messagebox
+
+        messagebox.showinfo(title, message, parent=self.root)
+
+    def ask_import_file(self):
+        from tkinter import filedialog
+
+        return filedialog.askopenfilename(title=IMPORT_PROMPT, filetypes=list(IMPORT_FILE_TYPES), parent=self.root)
+
+    def ask_save_file(self):
+        from tkinter import filedialog
+
+        return filedialog.asksaveasfilename(
+            title=SAVE_PROMPT, defaultextension=".png", filetypes=list(SAVE_FILE_TYPES), parent=self.root
+        )
+
+    def ask_stream_source(self):
+        from tkinter import simpledialog
+
+        return simpledialog.askstring("Stream", STREAM_PROMPT, initialvalue=STREAM_SOURCE, parent=self.root)
+
+
+class ChartApp:
+    # What the apps do with their buttons, whatever the toolkit: the session of entered and
+    # imported points, the chart embedded in `master`, imports, the 3D view next to `root`,
+    # saving and live streams. The apps only build their widgets, call these handlers and
+    # provide `dialogs` (SgDialogs or TkDialogs), `set_stream_label` for the Stream button and
+    # `quit`, which closes the window
+
+    def __init__(self, worker, dialogs, master, root, set_stream_label, quit):
+        self.worker = worker
+        self.dialogs = dialogs
+        self.master = master
+        self.root = root
+        self.set_stream_label = set_stream_label
+        self.quit = quit
+
+        # Chart embedded in the window, created on first use, and the 3D view in a window of its own
+        self.chart = None
+        self.chart3d = None
+
+        # Live readings from an instrument while the Stream button is on; they stay in a
+        # fixed-size window instead of the point store
+        self.reader = None
+        self.stream = None
+
+        # Opened on the worker; until then the handlers that need it are queued in _waiting
+        self.session = None
+        self.points = None
+        self._waiting = []
+
+    @property
+    def stream_interval(self):
+        # Milliseconds between stream frames, None while not streaming
+        return self.stream.interval_ms if self.stream is not None else None
+
+    def open_session(self):
+        # Entered and imported points, in growable NumPy columns. Every point is appended to
+        # the session on disk, which reopens on the next start. It is opened on the worker, so
+        # the window shows and takes input without waiting for NumPy or the saved columns
+        self.worker.submit(load_session, self._session_opened)
+
+    def _session_opened(self, future):
+        from lab_session import Session
+        from lab_startup import report_startup
+
+        try:
+            self.session = future.result()
+        except (OSError, RuntimeError, ValueError) as e:
+            self.dialogs.error(f"Points will not be saved: {str(e)}")
+            self.session = Session(None)
+        self.points = self.session.points
+        report_startup("session")
+
+        # Points of the previous session are back on the chart as soon as the background is found
+        if len(self.points):
+            self.worker.submit(nearest_background, self.show_chart, float(self.points.L[-1]))
+
+        waiting, self._waiting = self._waiting, []
+        for action in waiting:
+            action()
+
+    def _deferred(self, handler, *args):
+        # True while the session is still opening, with handler(*args) queued until it is open
+        if self.session is not None:
+            return False
+        self._waiting.append(partial(handler, *args))
+        return True
+
+    def create_chart(self, background, prepared=None):
+        # Loaded on first use so the input window opens without the plotting stack
+        from instrumentation import render, stage
+
+        points = self.points
+        try:
+            # Timed stage by stage with LABCOLORCHART_PROFILE; the draw itself follows on the idle loop
+            with render("create_lab_color_chart"):
+                if self.chart is None:
+                    # Create the chart once inside the window; later points are added to it in place
+                    with stage("embed_chart"):
+                        self.chart = embed_chart(self.master, background)
+                else:
+                    with stage("set_background"):
+                        self.chart.set_background(background)
+
+                if prepared is not None:
+                    # Binned and labelled on the worker thread, only the artists are left to update
+                    self.chart.apply_points(prepared)
+                else:
+                    # The chart keeps views of the store's columns and draws only the new tail
+                    self.chart.update_points(points.L, points.a, points.b)
+
+        except Exception as e:
+            self.dialogs.error(f"Error displaying chart: {str(e)}")
+
+    def show_chart(self, future):
+        from lab_startup import STARTUP_BENCH, report_startup
+
+        try:
+            background = future.result()
+        except (OSError, ValueError) as e:
+            self.dialogs.error(f"Error loading the chart background: {str(e)}")
+            return
+
+        # Display the LAB color chart over the gamut slice
+        self.create_chart(background)
+
+        if STARTUP_BENCH:
+            self.chart.fig.canvas.draw()
+            report_startup("chart")
+            self.quit()
+
+    def show_background(self, future):
+        try:
+            self.chart.set_background(future.result())
+        except (OSError, ValueError):
+            pass
+
+    def add(self, L, a, b):
+        # Show: the typed L*, a* and b* join the session, or the live window while streaming
+        try:
+            L, a, b = parse_lab(L, a, b)
+        except ValueError:
+            self.dialogs.error(INVALID_ENTRY)
+            return
+        if self._deferred(self.add, L, a, b):
+            return
+
+        if self.stream is not None:
+            # Joins the live window like any other reading
+            self.stream.buffer.append(L, a, b)
+            return
+
+        self.session.append(L, a, b, timestamp=time.time())
+
+        # sRGB gamut slice at the latest L*, looked up off the UI thread
+        self.worker.submit(nearest_background, self.show_chart, L)
+
+    def import_file(self):
+        if self._deferred(self.import_file):
+            return
+        path = self.dialogs.ask_import_file()
+        if not path:
+            return
+
+        # Parsing, binning and labelling run on the worker against the chart as it is now
+        self.create_chart(None)
+        if self.chart is not None:
+            chart = self.chart
+            self.worker.submit(prepare_import, partial(self.show_import, path), chart, path, chart_points(chart))
+
+    def show_import(self, path, future):
+        try:
+            L, a, b, stats, background, prepared = future.result()
+        except (OSError, ValueError) as e:
+            self.dialogs.error(f"Error importing file: {str(e)}")
+            return
+
+        if len(L):
+            # The file name becomes the batch of its points
+            self.session.extend(L, a, b, timestamp=time.time(), batch=os.path.basename(path))
+
+            # Points entered while the file was read make the prepared arrays stale
+            if prepared.count != len(self.points):
+                prepared = None
+            self.create_chart(background, prepared)
+
+        self.dialogs.info("Import", str(stats))
+
+    def open_3d(self):
+        # Levels of detail are built on the worker
+        if self._deferred(self.open_3d):
+            return
+        if self.chart3d is None or self.chart3d.closed:
+            self.chart3d = open_chart3d(self.root)
+        points = self.points
+        self.worker.submit(self.chart3d.prepare_points, self.show_3d, points.L, points.a, points.b)
+
+    def show_3d(self, future):
+        try:
+            prepared = future.result()
+        except ValueError as e:
+            self.dialogs.error(f"Error displaying 3D chart: {str(e)}")
+            return
+        if not self.chart3d.closed:
+            self.chart3d.apply_points(prepared)
+
+    def save(self):
+        if self.chart is None:
+            return
+        path = self.dialogs.ask_save_file()
+        if not path:
+            return
+
+        from lab_export import prepare_save
+
+        try:
+            # The figure is drawn now; compressing and writing the file run on the worker
+            self.worker.submit(prepare_save(self.chart, path), self.show_saved)
+        except (OSError, ValueError) as e:
+            self.dialogs.error(f"Error saving: {str(e)}")
+
+    def show_saved(self, future):
+        try:
+            path = future.result()
+        except (OSError, ValueError) as e:
+            self.dialogs.error(f"Error saving: {str(e)}")
+            return
+        self.dialogs.info("Save", f"Saved {path}")
+
+    def toggle_stream(self):
+        if self._deferred(self.toggle_stream):
+            return
+        if self.stream is not None:
+            self.stop_stream()
+            return
+
+        spec = self.dialogs.ask_stream_source()
+        if not spec:
+            return
+
+        from lab_stream import RingBuffer, StreamReader, StreamView
+
+        try:
+            buffer = RingBuffer()
+            self.reader = StreamReader(spec, buffer).start()
+        except ValueError as e:
+            self.dialogs.error(f"Cannot open stream: {str(e)}")
+            return
+        self.stream = StreamView(buffer)
+        self.set_stream_label("Stop")
+        self.create_chart(None)
+
+    def refresh_stream(self):
+        # Called every stream_interval: readings that arrived since the last frame are drawn together
+        if self.stream is None:
+            return
+        chart = self.chart
+        if chart is not None and self.stream.refresh(chart):
+            self.worker.submit(nearest_background, self.show_background, chart.L_values[-1])
+        if self.reader.error is not None:
+            self.dialogs.error(f"Stream stopped: {str(self.reader.error)}")
+            self.stop_stream()
+
+    def stop_stream(self):
+        self.reader.stop()
+        self.reader = self.stream = None
+        self.set_stream_label("Stream")
+
+        # Back to the manually entered points
+        if self.chart is not None:
+            self.chart.set_points(self.points.L, self.points.a, self.points.b)
+
+    def clear(self):
+        # Clears the chart and the saved session; the app clears its entries
+        if self._deferred(self.clear):
+            return
+        if self.stream is not None:
+            self.stream.buffer.clear()
+        if self.chart is not None:
+            self.chart.set_points([], [], [])
+        self.session.clear()
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.stop()
+        self.worker.shutdown()
+        if self.session is not None:
+            self.session.close()
+
+
+def run_sg_app(window):
+    # Event loop of the PySimpleGUI apps, which differ only in their layout. `window` is finalized
+    # and has L, a and b inputs, the Show, Import, Stream, 3D, Save, Clear and Exit buttons and a
+    # Canvas keyed "chart"; returns once the window is closed
+    import PySimpleGUI as sg
+
+    from lab_startup import BENCH_POINT, STARTUP_BENCH, preload_in_background, report_startup
+
+    report_startup("window")
+
+    # The plotting stack loads while the user types the first values
+    preload_in_background()
+
+    # Gamut lookups and imports run on the worker and come back to the loop as WORKER_EVENT
+    app = ChartApp(
+        sg_worker(window),
+        SgDialogs(),
+        window["chart"].TKCanvas,
+        window.TKroot,
+        set_stream_label=window["Stream"].update,
+        quit=lambda: window.write_event_value("Exit", None),
+    )
+
+    if STARTUP_BENCH:
+        for key, value in zip("Lab", BENCH_POINT):
+            window[key].update(value)
+        window.write_event_value("Show", None)
+
+    # The saved session opens on the worker too; buttons that need it wait for it
+    app.open_session()
+
+    handlers = {"Import": app.import_file, "3D": app.open_3d, "Save": app.save, "Stream": app.toggle_stream}
+    while True:
+        # While streaming the loop wakes up every frame even without user input
+        event, values = window.read(timeout=app.stream_interval)
+
+        if event == sg.WIN_CLOSED or event == "Exit":
+            break
+
+        if event == WORKER_EVENT:
+            done, future = values[event]
+            done(future)
+
+        app.refresh_stream()
+
+        if event == "Show":
+            app.add(values["L"], values["a"], values["b"])
+        elif event == "Clear":
+            for key in "Lab":
+                window[key].update("")
+            app.clear()
+        elif event in handlers:
+            handlers[event]()
+
+    app.close()
+    window.close()
@@ -0,0 +1,155 @@
+import json
+import os
+
+import numpy as np
+
+
+# Points the store has room for before its first resize
+INITIAL_CAPACITY = 1024
+
+# Sample IDs are stored as fixed-width UTF-8 so the column can be memory-mapped; batches are
+# stored as indices into the store's list of batch names
+TEXT_WIDTH = 32
+
+COLUMNS = ("L", "a", "b")
+METADATA = ("sample_id", "timestamp", "batch")
+
+
+class PointStore:
+    # Growable columnar store for L*a*b* points: one preallocated array per column, doubled when
+    # full, so appending is amortized O(1) and nothing is boxed per point. The L, a and b
+    # properties are views, which the chart keeps without copying. Rows are never changed once
+    # written and a resize or clear() moves to new arrays, so views handed out stay valid
+
+    def __init__(self, capacity=INITIAL_CAPACITY, dtype=np.float64, metadata=False):
+        self.dtype = np.dtype(dtype)
+        self.metadata = metadata
+        self.size = 0
+        self.batches = []
+        self._batch_codes = {}
+        self._columns = self._allocate(max(int(capacity), 1))
+
+    @classmethod
+    def from_columns(cls, columns, batches=()):
+        # Store over existing arrays, e.g. memory maps; they are copied on the first append
+        store = cls.__new__(cls)
+        store.dtype = columns["L"].dtype
+        store.metadata = all(name in columns for name in METADATA)
+        store.size = len(columns["L"])
+        store.batches = list(batches)
+        store._batch_codes = {name: code for code, name in enumerate(store.batches)}
+        store._columns = {name: columns[name] for name in COLUMNS + (METADATA if store.metadata else ())}
+        return store
+
+    def _allocate(self, capacity):
+        columns = {name: np.empty(capacity, dtype=self.dtype) for name in COLUMNS}
+        if self.metadata:
+            columns["sample_id"] = np.zeros(capacity, dtype=f"S{TEXT_WIDTH}")
+            columns["timestamp"] = np.full(capacity, np.nan)
+            columns["batch"] = np.full(capacity, -1, dtype=np.int32)
+        return columns
+
+    def _batch_code(self, name):
+        code = self._batch_codes.get(name)
+        if code is None:
+            code = self._batch_codes[name] = len(self.batches)
+            self.batches.append(name)
+        return code
+
+    @property
+    def capacity(self):
+        return len(self._columns["L"])
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, size):
+        if size <= self.capacity:
+            return
+        capacity = max(self.capacity, 1)
+        while capacity < size:
+            capacity *= 2
+        columns = self._allocate(capacity)
+        for name, column in self._columns.items():
+            columns[name][: self.size] = column[: self.size]
+        self._columns = columns
+
+    def append(self, L, a, b, sample_id=None, timestamp=None, batch=None):
+        self.extend([L], [a], [b], sample_id, timestamp, batch)
+
+    def extend(self, L_values, a_values, b_values, sample_id=None, timestamp=None, batch=None):
+        # Metadata may be one value for all new points or one per point; missing timestamps are NaN
+        L_values = np.atleast_1d(L_values)
+        count = len(L_values)
+        if count == 0:
+            return
+        self._reserve(self.size + count)
+
+        rows = slice(self.size, self.size + count)
+        for name, values in zip(COLUMNS, (L_values, a_values, b_values)):
+            self._columns[name][rows] = values
+        if self.metadata:
+            if sample_id is not None:
+                self._columns["sample_id"][rows] = np.char.encode(np.asarray(sample_id, dtype=str), "utf-8")
+            self._columns["timestamp"][rows] = np.nan if timestamp is None else timestamp
+            if isinstance(batch, str):
+                self._columns["batch"][rows] = self._batch_code(batch)
+            elif batch is not None:
+                self._columns["batch"][rows] = [self._batch_code(str(name)) for name in batch]
+        self.size += count
+
+    def clear(self):
+        self.size = 0
+        self.batches = []
+        self._batch_codes = {}
+        self._columns = self._allocate(INITIAL_CAPACITY)
+
+    def column(self, name):
+        return self._columns[name][: self.size]
+
+    def sample_ids(self, rows=slice(None)):
+        return np.char.decode(self.column("sample_id")[rows], "utf-8")
+
+    def batch_names(self, rows=slice(None)):
+        # Batch name of each point, "" where none was given
+        names = np.array(self.batches + [""], dtype=str)
+        return names[self.column("batch")[rows]]
+
+    @property
+    def L(self):
+        return self._columns["L"][: self.size]
+
+    @property
+    def a(self):
+        return self._columns["a"][: self.size]
+
+    @property
+    def b(self):
+        return self._columns["b"][: self.size]
+
+    def save(self, directory):
+        # One .npy file per column, so load() can memory-map them
+        os.makedirs(directory, exist_ok=True)
+        for name in self._columns:
+            np.save(os.path.join(directory, f"{name}.npy"), self.column(name))
+        if self.metadata:
+            with open(os.path.join(directory, "batches.json"), "w") as f:
+                json.dump(self.batches, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        # Columns are memory-mapped, so opening is instant at any size; the first append
+        # copies them into memory
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in COLUMNS + METADATA
+            if os.path.exists(os.path.join(directory, f"{name}.npy"))
+        }
+        if any(name not in columns for name in COLUMNS):
+            raise ValueError(f"{directory} does not hold L.npy, a.npy and b.npy")
+
+        batches = []
+        if os.path.exists(os.path.join(directory, "batches.json")):
+            with open(os.path.join(directory, "batches.json")) as f:
+                batches = json.load(f)
+        return cls.from_columns(columns, batches)
@@ -0,0 +1,305 @@
+import itertools
+
+import numpy as np
+
+from delta_e import delta_e, delta_e76
+
+
+# Average number of swatches per grid cell when the cell size is chosen automatically
+SWATCHES_PER_CELL = 2.0
+
+# Rings of cells searched around a query; queries whose answer may lie farther out are finished
+# by a dE76 scan of the whole library
+MAX_RING = 3
+
+# Queries processed together; bounds the candidate-pair arrays
+QUERY_BLOCK = 8192
+
+# Queries per block and candidate pairs per group of the library scan
+SCAN_BLOCK = 256
+SCAN_PAIRS = 1 << 22
+
+# Lower bound of the CIEDE2000 rotation term: |RT| <= 2 sin(60 deg), so the chroma and hue
+# terms keep at least 1 - sin(60 deg) of their weight
+_RT_FLOOR = np.sqrt(1.0 - np.sin(np.radians(60.0)))
+
+
+def _ring(r):
+    # Cell offsets at Chebyshev distance r
+    cube = np.array(list(itertools.product(range(-r, r + 1), repeat=3)), dtype=np.int64)
+    return cube[np.abs(cube).max(axis=1) == r]
+
+
+_RINGS = [_ring(r) for r in range(MAX_RING + 1)]
+
+# Cell coordinates are packed into one int64 key, 21 bits per axis
+_BITS = 21
+_OFFSET = 1 << (_BITS - 1)
+
+
+def _group_rank(q, d, n):
+    # Sorts pairs by (query, distance) and returns them with each pair's rank inside its query
+    scale = 1.0 / (d.max() * 1.000001 + 1e-12) if len(d) else 1.0
+    order = np.argsort(q + d * scale, kind="stable")
+    q = q[order]
+    rank = np.arange(len(q)) - np.searchsorted(q, np.arange(n))[q]
+    return order, q, rank
+
+
+def auto_cell_size(lab, per_cell=SWATCHES_PER_CELL):
+    # Edge of a cube holding per_cell swatches on average inside the library's bounding box
+    extent = np.maximum(lab.max(axis=0) - lab.min(axis=0), 1.0)
+    return float(np.cbrt(np.prod(extent) * per_cell / len(lab)))
+
+
+def _pack(cells):
+    cells = cells + _OFFSET
+    return (cells[..., 0] << (2 * _BITS)) | (cells[..., 1] << _BITS) | cells[..., 2]
+
+
+class SwatchIndex:
+    # Grid-bucket index over reference swatches: candidates come from rings of cells around each
+    # query, widened until no swatch outside them can be closer, and are ranked with the exact
+    # delta E formula
+
+    def __init__(self, lab, names=None, cell_size=None):
+        lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+        if len(lab) == 0:
+            raise ValueError("Cannot index an empty swatch library")
+
+        self.cell_size = float(cell_size) if cell_size is not None else auto_cell_size(lab)
+        keys = _pack(np.floor(lab / self.cell_size).astype(np.int64))
+
+        # Swatches sorted by cell so each cell is one contiguous run found with searchsorted
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.lab = lab[order]
+        self.order = order
+        self.names = None if names is None else np.asarray(names).astype(str)[order]
+        self._sort_by_L()
+
+    def _sort_by_L(self):
+        # Library order by L* for the scan, and the farthest L* from 50 for the CIEDE2000 bound
+        self._L_order = np.argsort(self.lab[:, 0], kind="stable")
+        self._L_offset = float(np.abs(self.lab[:, 0] - 50.0).max())
+
+    def __len__(self):
+        return len(self.lab)
+
+    def _search_radius(self, method, distance, lab):
+        # The largest |dL*| and |da*b*| from each query at which a swatch can still be within
+        # `distance` by `method`; every swatch that could beat the current k-th best lies inside both
+        distance = distance * (1.0 + 1e-9) + 1e-9
+        if method == "76":
+            return distance, distance
+        chroma = np.hypot(lab[:, 1], lab[:, 2])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if method == "94":
+                # |dL| <= dE94 and |dab| <= SC * dE94, SC = 1 + 0.045 C of the swatch <= 1 + 0.045 (C + |dab|)
+                dL = distance
+                dab = (1.0 + 0.045 * chroma) * distance / (1.0 - 0.045 * distance)
+                dab = np.where(0.045 * distance < 1.0, dab, np.inf)
+            else:
+                # |dL| <= SL * dE00 with SL at the farthest L* from 50; |dab| <= SC * dE00 / _RT_FLOOR
+                # with SC = 1 + 0.045 C' and C' <= 1.5 (C + |dab| / 2)
+                offset = np.maximum(np.abs(lab[:, 0] - 50.0), self._L_offset) ** 2
+                dL = (1.0 + 0.015 * offset / np.sqrt(20.0 + offset)) * distance
+                u = distance / _RT_FLOOR
+                dab = (1.0 + 0.0675 * chroma) * u / (1.0 - 0.03375 * u)
+                dab = np.where(0.03375 * u < 1.0, dab, np.inf)
+        return dL, dab
+
+    def _ring_pairs(self, lab, offsets):
+        # (query, swatch) pairs for every swatch in the cells at `offsets` from each query's cell
+        cells = np.floor(lab / self.cell_size).astype(np.int64)
+        queries, swatches = [], []
+        for offset in offsets:
+            keys = _pack(cells + offset)
+            starts = np.searchsorted(self.keys, keys, side="left")
+            counts = np.searchsorted(self.keys, keys, side="right") - starts
+            hit = np.flatnonzero(counts)
+            if len(hit) == 0:
+                continue
+            counts = counts[hit]
+            q = np.repeat(hit, counts)
+
+            # Position within each run, added to the run's start
+            run_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            queries.append(q)
+            swatches.append(np.repeat(starts[hit], counts) + run_offsets)
+
+        if not queries:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(queries), np.concatenate(swatches)
+
+    def _merge(self, lab, best_s, best_d, q, s, method):
+        # Scores the (query, swatch) pairs with the requested formula (reference swatch first)
+        # and keeps the k best per query in best_s/best_d
+        n, k = best_d.shape
+        exact = delta_e(self.lab[s], lab[q], method)
+        known = np.isfinite(best_d)
+        rows = np.nonzero(known)[0]
+        q = np.concatenate([rows, q])
+        s = np.concatenate([best_s[known], s])
+        exact = np.concatenate([best_d[known], exact])
+
+        order, q, rank = _group_rank(q, exact, n)
+        s, exact = s[order], exact[order]
+        keep = rank < k
+        best_s[q[keep], rank[keep]] = s[keep]
+        best_d[q[keep], rank[keep]] = exact[keep]
+
+    def _scan(self, lab, best_s, best_d, active, method):
+        # Exact finish for queries the rings could not settle, over the whole library: candidates
+        # come from the L* window of the search radius, the library being kept sorted by L* too
+        k = best_d.shape[1]
+
+        # Queries with fewer than k swatches so far start from their k nearest by dE76
+        lacking = active[np.isinf(best_d[active, -1])]
+        if k < len(self.lab):
+            for start in range(0, len(lacking), SCAN_BLOCK):
+                rows = lacking[start : start + SCAN_BLOCK]
+                d76 = delta_e76(lab[rows, None, :], self.lab[None, :, :])
+                nearest = np.argpartition(d76, k - 1, axis=1)[:, :k]
+                best_s[rows] = -1
+                best_d[rows] = np.inf
+                self._merge(lab, best_s, best_d, np.repeat(rows, k), nearest.ravel(), method)
+
+        L_radius, ab_radius = self._search_radius(method, best_d[active, -1], lab[active])
+        L_sorted = self.lab[self._L_order, 0]
+        starts = np.searchsorted(L_sorted, lab[active, 0] - L_radius, side="left")
+        counts = np.searchsorted(L_sorted, lab[active, 0] + L_radius, side="right") - starts
+
+        # Queries in groups of about SCAN_PAIRS candidate pairs
+        group = np.cumsum(counts) // SCAN_PAIRS
+        for chunk in np.split(np.arange(len(active)), np.flatnonzero(np.diff(group)) + 1):
+            rows = active[chunk]
+            n = counts[chunk]
+            q = np.repeat(rows, n)
+            run_offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+            s = self._L_order[np.repeat(starts[chunk], n) + run_offsets]
+            dab = np.hypot(lab[q, 1] - self.lab[s, 1], lab[q, 2] - self.lab[s, 2])
+            inside = dab <= np.repeat(ab_radius[chunk], n)
+
+            # The current best are within the radius too and come back from the scan
+            best_s[rows] = -1
+            best_d[rows] = np.inf
+            self._merge(lab, best_s, best_d, q[inside], s[inside], method)
+
+    def _query_block(self, lab, k, method):
+        # Ring by ring outwards from each query's cell: a query is settled once every swatch that
+        # could still beat its k-th best (by the search radius) lies in the rings already searched.
+        # Swatches outside ring r are at least r cells away along L*, a* or b*
+        n = len(lab)
+        best_s = np.full((n, k), -1, dtype=np.intp)
+        best_d = np.full((n, k), np.inf)
+        active = np.arange(n)
+        for r, offsets in enumerate(_RINGS):
+            q, s = self._ring_pairs(lab[active], offsets)
+            if len(q):
+                self._merge(lab, best_s, best_d, active[q], s, method)
+            L_radius, ab_radius = self._search_radius(method, best_d[active, -1], lab[active])
+            active = active[np.maximum(L_radius, ab_radius) > r * self.cell_size]
+            if len(active) == 0:
+                break
+        if len(active):
+            self._scan(lab, best_s, best_d, active, method)
+
+        indices = np.where(best_s >= 0, self.order[np.maximum(best_s, 0)], -1)
+        return indices, best_d
+
+    def query(self, lab, k=1, method="2000"):
+        # Returns (indices, distances) of shape (n, k) into the original swatch order, exact for
+        # every method; -1/inf pad rows when the library has fewer than k swatches
+        lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+        indices = np.empty((len(lab), k), dtype=np.intp)
+        distances = np.empty((len(lab), k))
+        for start in range(0, len(lab), QUERY_BLOCK):
+            block = slice(start, start + QUERY_BLOCK)
+            indices[block], distances[block] = self._query_block(lab[block], k, method)
+        return indices, distances
+
+    def name_of(self, indices):
+        # Swatch names for original-order indices
+        if self.names is None:
+            return np.asarray(indices).astype(str)
+        names = np.empty(len(self.names), dtype=self.names.dtype)
+        names[self.order] = self.names
+        return names[np.asarray(indices)]
+
+    def save(self, path):
+        # Stored already sorted, so loading needs no rebuild
+        arrays = {"keys": self.keys, "lab": self.lab, "order": self.order, "cell_size": np.array(self.cell_size)}
+        if self.names is not None:
+            arrays["names"] = self.names
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        index = cls.__new__(cls)
+        with np.load(path, allow_pickle=False) as data:
+            index.keys = data["keys"]
+            index.lab = data["lab"]
+            index.order = data["order"]
+            index.cell_size = float(data["cell_size"])
+            index.names = data["names"] if "names" in data else None
+        index._sort_by_L()
+        return index
+
+
+def build_swatch_index(path, name_column=None, cell_size=None, **options):
+    # Reads a swatch library with the bulk importer; names come from name_column when given
+    from lab_import import import_lab_file, import_lab_groups
+
+    if name_column is None:
+        L, a, b, _ = import_lab_file(path, **options)
+        return SwatchIndex(np.column_stack([L, a, b]), cell_size=cell_size)
+
+    groups, _ = import_lab_groups(path, name_column, **options)
+    names = np.repeat(np.array(list(groups), dtype=str), [len(L) for L, _, _ in groups.values()])
+    lab = np.concatenate([np.column_stack(columns) for columns in groups.values()])
+    return SwatchIndex(lab, names, cell_size=cell_size)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query a nearest-swatch index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Index a CSV/Parquet swatch library and save it")
+    build.add_argument("library")
+    build.add_argument("output", help="Index file (.npz)")
+    build.add_argument("--name-column", help="Column holding the swatch names")
+    build.add_argument("--cell-size", type=float)
+
+    query = commands.add_parser("query", help="Print the nearest swatches for a file of points")
+    query.add_argument("index", help="Index file (.npz)")
+    query.add_argument("points", help="CSV/Parquet file of L*a*b* points")
+    query.add_argument("-k", type=int, default=1)
+    query.add_argument("--method", choices=("76", "94", "2000"), default="2000")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        index = build_swatch_index(args.library, args.name_column, args.cell_size)
+        index.save(args.output)
+        print(f"Indexed {len(index)} swatches (cell size {index.cell_size:.2f}) into {args.output}")
+        return 0
+
+    from lab_import import import_lab_file
+
+    index = SwatchIndex.load(args.index)
+    L, a, b, _ = import_lab_file(args.points)
+    indices, distances = index.query(np.column_stack([L, a, b]), k=args.k, method=args.method)
+    names = index.name_of(np.maximum(indices, 0))
+    print("L*,a*,b*," + ",".join(f"match{i + 1},dE{i + 1}" for i in range(args.k)))
+    for row in range(len(L)):
+        matches = ",".join(f"{names[row, i]},{distances[row, i]:.3f}" for i in range(args.k))
+        print(f"{L[row]},{a[row]},{b[row]},{matches}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The modules live at the repository root; charts are drawn without a display, and slices are
+# cached in a directory of the test run rather than the user's cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("LABCOLORCHART_CACHE", tempfile.mkdtemp(prefix="labcolorchart-test-"))
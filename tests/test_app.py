@@ -0,0 +1,125 @@
+from concurrent.futures import Future
+
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import lab_session
+import lab_ui
+from lab_chart import LabChart
+from lab_ui import INVALID_ENTRY, ChartApp
+
+
+class SyncWorker:
+    # Runs each job at once and hands its result straight back, as the UI thread would get it
+    def submit(self, work, done, *args):
+        future = Future()
+        try:
+            future.set_result(work(*args))
+        except Exception as e:
+            future.set_exception(e)
+        done(future)
+        return future
+
+    def shutdown(self):
+        pass
+
+
+class HeldWorker(SyncWorker):
+    # Keeps the jobs until run() is called, like a worker still busy when the user clicks
+    def __init__(self):
+        self.held = []
+
+    def submit(self, work, done, *args):
+        self.held.append((work, done, args))
+
+    def run(self):
+        while self.held:
+            work, done, args = self.held.pop(0)
+            SyncWorker.submit(self, work, done, *args)
+
+
+class Dialogs:
+    def __init__(self):
+        self.errors = []
+        self.infos = []
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def info(self, title, message):
+        self.infos.append((title, message))
+
+
+def agg_chart(master, background=None):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    return LabChart(background, fig=fig)
+
+
+@pytest.fixture
+def new_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(lab_session, "SESSION_DIR", str(tmp_path / "session"))
+    monkeypatch.setattr(lab_ui, "embed_chart", agg_chart)
+    apps = []
+
+    def new_app(worker=None):
+        app = ChartApp(
+            worker or SyncWorker(), Dialogs(), None, None, set_stream_label=lambda text: None, quit=lambda: None
+        )
+        app.open_session()
+        apps.append(app)
+        return app
+
+    yield new_app
+    for app in apps:
+        app.close()
+
+
+def test_shown_points_reach_the_chart_and_the_session(new_app):
+    app = new_app()
+    app.add("50", "10", "-20")
+    app.add(" 60 ", "0", "5.5")
+
+    assert app.dialogs.errors == []
+    assert app.chart.count == 2
+    assert app.points.L.tolist() == [50.0, 60.0]
+
+    app.close()
+    reopened = new_app()
+    assert reopened.chart.count == 2
+
+
+@pytest.mark.parametrize("values", [("nan", "0", "0"), ("50", "inf", "0"), ("50", "0", "x")])
+def test_invalid_entries_are_refused(new_app, values):
+    app = new_app()
+    app.add(*values)
+
+    assert app.dialogs.errors == [INVALID_ENTRY]
+    assert len(app.points) == 0
+    assert app.chart is None
+
+
+def test_entries_wait_for_the_session(new_app):
+    worker = HeldWorker()
+    app = new_app(worker)
+    app.add("50", "10", "-20")
+    app.clear()
+    app.add("60", "0", "5")
+
+    assert app.session is None
+    assert app.chart is None
+
+    worker.run()
+    assert app.dialogs.errors == []
+    assert app.points.L.tolist() == [60.0]
+    assert app.chart.count == 1
+
+
+def test_clear_empties_the_chart_and_the_session(new_app):
+    app = new_app()
+    app.add("50", "10", "-20")
+    app.clear()
+
+    assert app.chart.count == 0
+    assert len(app.session) == 0
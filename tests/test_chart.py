@@ -0,0 +1,16 @@
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from lab_chart import LabChart
+
+
+def test_axes_are_labelled_as_plotted():
+    # Points are plotted with a* across and b* up, as in the 3D view and the gamut slices
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    chart = LabChart(None, fig=fig, auto_redraw=False)
+    chart.set_points([50.0], [40.0], [-10.0])
+
+    assert chart.ax.get_xlabel() == "a*"
+    assert chart.ax.get_ylabel() == "b*"
+    assert chart.scatter.get_offsets().tolist() == [[40.0, -10.0]]
@@ -0,0 +1,22 @@
+import math
+
+import numpy as np
+import pytest
+
+from lab_gamut import LabSlices, lab_slice
+
+
+@pytest.mark.parametrize("L", [math.nan, math.inf, -math.inf])
+def test_slice_lookups_reject_non_finite_L(L):
+    slices = LabSlices(np.zeros((101, 2, 2, 4), dtype=np.uint8), 1.0)
+    with pytest.raises(ValueError):
+        slices.nearest(L)
+    with pytest.raises(ValueError):
+        lab_slice(L, 8)
+
+
+def test_nearest_clamps_finite_L():
+    slices = LabSlices(np.arange(101).reshape(101, 1, 1, 1), 1.0)
+    assert slices.nearest(-5.0)[0, 0, 0] == 0
+    assert slices.nearest(49.6)[0, 0, 0] == 50
+    assert slices.nearest(250.0)[0, 0, 0] == 100
@@ -0,0 +1,44 @@
+import pytest
+
+from lab_import import import_lab_file
+
+PREAMBLE = "Spectro 3000 export\nDate;2024-05-02\n\nIlluminant;D65/10\n"
+
+
+def write(tmp_path, text, name="points.csv"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_plain_file(tmp_path):
+    L, a, b, stats = import_lab_file(write(tmp_path, "L*,a*,b*\n50,1.5,-2\n60,0,3\n"))
+    assert L.tolist() == [50.0, 60.0]
+    assert a.tolist() == [1.5, 0.0]
+    assert b.tolist() == [-2.0, 3.0]
+    assert stats.rows == 2
+
+
+def test_header_is_found_after_a_preamble(tmp_path):
+    path = write(tmp_path, PREAMBLE + "Sample;CIE L;CIE a;CIE b\nS1;50,5;1,5;-2\nS2;60;0;3,25\n")
+    L, a, b, stats = import_lab_file(path)
+    assert L.tolist() == [50.5, 60.0]
+    assert a.tolist() == [1.5, 0.0]
+    assert b.tolist() == [-2.0, 3.25]
+
+
+def test_header_of_given_columns_is_found(tmp_path):
+    path = write(tmp_path, PREAMBLE + "Sample,Lc,ac,bc\nS1,50,1,2\n")
+    L, a, b, _ = import_lab_file(path, columns=["Lc", "ac", "bc"])
+    assert (L.tolist(), a.tolist(), b.tolist()) == ([50.0], [1.0], [2.0])
+
+
+def test_skip_rows_overrides_the_search(tmp_path):
+    path = write(tmp_path, "L,a,b\n1,2,3\nL,a,b\n50,1,2\n")
+    L, _, _, _ = import_lab_file(path, skip_rows=2)
+    assert L.tolist() == [50.0]
+
+
+def test_file_without_a_header_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="No L\\* column"):
+        import_lab_file(write(tmp_path, "Spectro 3000 export\n50,1,2\n"))
@@ -0,0 +1,15 @@
+import numpy as np
+
+from lab_indicator import L_LEVELS, L_level_counts, L_level_index
+
+
+def test_level_index_leaves_out_non_finite_L():
+    index = L_level_index([50.0, np.nan, np.inf, -np.inf, 100.0])
+    assert index.tolist() == [500, 1000]
+
+
+def test_level_counts_ignore_non_finite_L():
+    counts = L_level_counts([np.nan, 25.0, 25.0, np.inf])
+    assert len(counts) == L_LEVELS
+    assert counts.sum() == 2
+    assert counts[250] == 2
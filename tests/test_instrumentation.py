@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_with_profile(value):
+    # Imports instrumentation in a fresh interpreter, where LABCOLORCHART_PROFILE is read
+    env = dict(os.environ, LABCOLORCHART_PROFILE=value)
+    return subprocess.run(
+        [sys.executable, "-c", "import instrumentation; print(instrumentation.enabled, sorted(instrumentation.modes))"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_profile_modes_are_read_at_import():
+    result = import_with_profile("alloc,overlay")
+    assert result.returncode == 0
+    assert result.stdout.strip() == "True ['alloc', 'overlay', 'time']"
+
+
+def test_unknown_profile_mode_warns_and_stays_off():
+    result = import_with_profile("tim")
+    assert result.returncode == 0
+    assert result.stdout.strip() == "False []"
+    assert result.stderr.count("LABCOLORCHART_PROFILE ignored: Unknown profile mode tim") == 1
+
@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from lab_chart import LabChart
+
+
+def new_chart():
+    fig = Figure(figsize=(6.4, 4.8), dpi=100)
+    FigureCanvasAgg(fig)
+    return LabChart(None, fig=fig, auto_redraw=False)
+
+
+def random_points(rng, n):
+    return rng.uniform(20, 80, n), rng.normal(0, 30, n), rng.normal(0, 30, n)
+
+
+def shown_boxes(chart):
+    renderer = chart.fig.canvas.get_renderer()
+    return [text.get_window_extent(renderer) for text in chart.label_layer._shown.values()]
+
+
+def overlapping_pairs(boxes):
+    return [
+        (first, second)
+        for first, second in itertools.combinations(boxes, 2)
+        if first.x0 < second.x1 and second.x0 < first.x1 and first.y0 < second.y1 and second.y0 < first.y1
+    ]
+
+
+@pytest.mark.parametrize("n", [50, 500, 4000])
+@pytest.mark.parametrize("target", [None, (50.0, 0.0, 0.0)])
+def test_shown_labels_do_not_overlap(n, target):
+    chart = new_chart()
+    chart.set_target(target)
+    chart.set_points(*random_points(np.random.default_rng(n), n))
+    chart.fig.canvas.draw()
+
+    boxes = shown_boxes(chart)
+    assert boxes
+    assert overlapping_pairs(boxes) == []
+
+
+def test_labels_added_after_a_draw_do_not_overlap():
+    rng = np.random.default_rng(1)
+    chart = new_chart()
+    chart.set_points(*random_points(rng, 200))
+    chart.fig.canvas.draw()
+    for _ in range(100):
+        chart.add_points(*random_points(rng, 1))
+
+    boxes = shown_boxes(chart)
+    assert len(boxes) > 0
+    assert overlapping_pairs(boxes) == []
@@ -0,0 +1,17 @@
+from lab_render_farm import FarmSummary
+
+
+def test_summary_reports_parallelism_from_cpu_time():
+    summary = FarmSummary(4)
+    for pid in (1, 2, 1):
+        summary.add(0.5, 0.4, pid)
+    summary.wall = 0.6
+
+    text = str(summary)
+    assert "parallelism 2.00, utilization 50%" in text
+    assert "speedup" not in text
+    assert "charts per worker [2, 1]" in text
+
+
+def test_empty_summary():
+    assert str(FarmSummary(2)) == "No charts rendered"
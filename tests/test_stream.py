@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+
+from lab_stream import iter_tail_lines, parse_reading
+
+
+def test_parse_reading_formats():
+    assert parse_reading(b"52.1,10.3,-4.0\n") == (52.1, 10.3, -4.0)
+    assert parse_reading("L=52.1 a=10.3 b=-4.0") == (52.1, 10.3, -4.0)
+    assert parse_reading("52,1;10,3;-4,0") == (52.1, 10.3, -4.0)
+    assert parse_reading("52.1,10.3") is None
+
+
+def test_parse_reading_ignores_overflowing_numbers():
+    assert parse_reading("1e999,10,20") is None
+    assert parse_reading("50,-1e400,20") is None
+
+
+def test_tail_follows_replaced_and_truncated_files(tmp_path):
+    path = str(tmp_path / "feed.log")
+    with open(path, "w") as f:
+        f.write("old\n")
+    stop = threading.Event()
+    lines = []
+
+    def follow():
+        for line in iter_tail_lines(path, stop, poll_interval=0.02, from_start=True):
+            lines.append(line)
+
+    def wait_for(count):
+        deadline = time.time() + 5
+        while len(lines) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    try:
+        wait_for(1)
+        # Rotation: the file is moved away and a new one takes its name
+        os.rename(path, path + ".1")
+        with open(path, "w") as f:
+            f.write("new\n")
+        wait_for(2)
+        # Truncation of the new file
+        with open(path, "w") as f:
+            f.write("t\n")
+        wait_for(3)
+    finally:
+        stop.set()
+        thread.join()
+    assert lines == [b"old\n", b"new\n", b"t\n"]
@@ -0,0 +1,20 @@
+import pytest
+
+from lab_ui import parse_lab
+
+
+def test_parse_lab_reads_typed_numbers():
+    assert parse_lab("50", " 12.5 ", "-3e1") == (50.0, 12.5, -30.0)
+
+
+@pytest.mark.parametrize(
+    "values", [("nan", "0", "0"), ("50", "inf", "0"), ("50", "0", "-Infinity"), ("50", "1e999", "0")]
+)
+def test_parse_lab_rejects_non_finite_values(values):
+    with pytest.raises(ValueError):
+        parse_lab(*values)
+
+
+def test_parse_lab_rejects_text():
+    with pytest.raises(ValueError):
+        parse_lab("fifty", "0", "0")